@@ -0,0 +1,232 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import base64
+import argparse
+from pathlib import Path
+from bs4 import BeautifulSoup
+import CompanyCraw
+from TextPreparer import TextPreparer, count_tokens
+
+# Micro-benchmarks du crawler sur des pages HTML sauvegardées.
+# Le corpus est un dossier de fichiers .html/.htm, ou le cache HTTP (Cache/http) d'une exécution précédente.
+
+def load_corpus(path):
+    pages = []
+    for file_path in sorted(Path(path).rglob('*')):
+        try:
+            if file_path.suffix in ('.html', '.htm'):
+                pages.append(file_path.read_text(encoding='utf-8', errors='replace'))
+            elif file_path.suffix == '.json':
+                pages.append(json.loads(file_path.read_text(encoding='utf-8'))['body'])
+        except Exception as e:
+            print(f"Skipping {file_path}: {e}")
+    return pages
+
+# Page synthétique utilisée quand aucun corpus n'est disponible
+def synthetic_page(link_count=600, paragraph_count=200, seed=0):
+    rng = random.Random(seed)
+    words = ['company', 'product', 'service', 'team', 'history', 'market', 'solution', 'customer', 'quality', 'innovation']
+    sections = ['about', 'products', 'news', 'blog', 'contact', 'jobs', 'team', 'privacy', 'legal', 'services', 'events', 'faq']
+    links = [
+        f'<li><a href="/{rng.choice(sections)}/{i}">{" ".join(rng.choices(words, k=3))}</a></li>'
+        for i in range(link_count)
+    ]
+    paragraphs = [f'<p>{" ".join(rng.choices(words, k=40))}</p>' for _ in range(paragraph_count)]
+    return (
+        '<html><head><title>Example</title></head><body>'
+        f'<nav><ul>{"".join(links)}</ul></nav>'
+        f'<main>{"".join(paragraphs)}<p>Contact: info [at] example [dot] com</p>'
+        '<a href="mailto:jobs@example.com">Write to us</a><button onclick="location.href=\'mailto:hr@example.com\'">Mail</button></main>'
+        '</body></html>'
+    )
+
+def time_call(func, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def report(title, timings, size_bytes=None):
+    print(f"\n{title}")
+    baseline = next(iter(timings.values()))
+    for name, elapsed in timings.items():
+        throughput = f", {size_bytes / elapsed / 1e6:.1f} MB/s" if size_bytes else ""
+        print(f"  {name:<28} {elapsed * 1000:9.1f} ms  (x{baseline / elapsed:.1f}{throughput})")
+
+# Traitement d'une page de catégorie 1 avant PageAnalysis : trois parsings du même HTML
+def legacy_page_processing(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    soup.get_text(separator=' ', strip=True)
+    soup = BeautifulSoup(html, 'html.parser')
+    soup.get_text(separator='\n', strip=True)
+    "mailto" in str(soup.find_all(['a', 'button'])).lower()
+    soup = BeautifulSoup(html, 'html.parser')
+    [(link['href'], link.get_text(separator=' ', strip=True)) for link in soup.find_all('a', href=True)]
+
+# Travail de crawl_website.visit sur une page de catégorie 1 : blocs de texte du résumé, liens,
+# texte des e-mails et adresses mailto (extract_emails_with_context)
+def single_pass_page_processing(parser):
+    def process(html):
+        page = CompanyCraw.PageAnalysis(html, parser)
+        page.visible_text(separator='\n')
+        page.static_mailto_emails
+        page.needs_browser_for_mailto
+        page.text_blocks
+        page.anchors
+    return process
+
+def benchmark_page_analysis(pages, repeat):
+    timings = {"3x html.parser (legacy)": time_call(legacy_page_processing, pages, repeat)}
+    timings["PageAnalysis html.parser"] = time_call(single_pass_page_processing('html.parser'), pages, repeat)
+    if CompanyCraw.HTML_PARSER != 'html.parser':
+        timings[f"PageAnalysis {CompanyCraw.HTML_PARSER}"] = time_call(single_pass_page_processing(CompanyCraw.HTML_PARSER), pages, repeat)
+    report(f"Page analysis ({len(pages)} pages)", timings)
+
+# Mots-clés d'exemple quand Json_Files/lists.json n'est pas disponible
+SAMPLE_LIST_1 = [
+    'contact', 'kontakt', 'contatti', 'contacto', 'impressum', 'imprint', 'mentions légales', 'job', 'jobs', 'career', 'careers',
+    'karriere', 'carrière', 'carriere', 'carrera', 'emploi', 'stellen', 'stellenangebote', 'recrutement', 'recruiting', 'offres',
+    'vacancies', 'work with us', 'join us', 'team', 'equipe', 'lavora con noi', 'bewerbung', 'apply', 'hr', 'personal'
+]
+SAMPLE_LIST_2 = [
+    'about', 'about us', 'ueber uns', 'über uns', 'a propos', 'chi siamo', 'quienes somos', 'company', 'unternehmen', 'entreprise',
+    'history', 'geschichte', 'histoire', 'mission', 'values', 'werte', 'products', 'produkte', 'produits', 'services',
+    'dienstleistungen', 'solutions', 'loesungen', 'news', 'actualites', 'portrait', 'philosophy', 'referenzen', 'references'
+]
+
+def load_benchmark_lists():
+    list_1, list_2 = CompanyCraw.load_lists()
+    return (list_1, list_2) if list_1 or list_2 else (SAMPLE_LIST_1, SAMPLE_LIST_2)
+
+# Classification des liens avant KeywordMatcher : normalize_text sur chaque mot-clé, pour chaque lien
+def legacy_contains_keyword(url, text, keywords):
+    normalized_url = CompanyCraw.normalize_text(url)
+    normalized_text = CompanyCraw.normalize_text(text)
+    return any(CompanyCraw.normalize_text(keyword) in normalized_url or CompanyCraw.normalize_text(keyword) in normalized_text for keyword in keywords)
+
+def legacy_classify(url, text, list_1, list_2):
+    if legacy_contains_keyword(url, text, list_1):
+        return 0
+    if legacy_contains_keyword(url, text, list_2) or url in list_2:
+        return 1
+    return None
+
+def benchmark_link_classification(pages, repeat):
+    list_1, list_2 = load_benchmark_lists()
+    matcher = CompanyCraw.KeywordMatcher(list_1, list_2)
+    anchors = [(f"https://example.com{href}", text) for html in pages for href, text in CompanyCraw.PageAnalysis(html).anchors]
+
+    def matcher_classify(url, text):
+        match = matcher.match(url, text)
+        return match[0] if match else None
+
+    mismatches = sum(1 for url, text in anchors if legacy_classify(url, text, list_1, list_2) != matcher_classify(url, text))
+    timings = {
+        "contains_keyword (legacy)": time_call(lambda anchor: legacy_classify(*anchor, list_1, list_2), anchors, repeat),
+        "KeywordMatcher": time_call(lambda anchor: matcher_classify(*anchor), anchors, repeat),
+    }
+    report(f"Link classification ({len(anchors)} links, {len(list_1) + len(list_2)} keywords, {mismatches} mismatches)", timings)
+
+LEGACY_AT_VARIANTS = ['[at]', '(at)', '{at}', '[AT]', '(AT)', '{AT}', ' at ']
+LEGACY_DOT_VARIANTS = ['[dot]', '(dot)', '{dot}', '[DOT]', '(DOT)', '{DOT}', ' dot ']
+
+def legacy_is_base64(s):
+    try:
+        return base64.b64encode(base64.b64decode(s)).decode('utf-8') == s
+    except Exception:
+        return False
+
+# Extraction des e-mails avant EmailExtractor : 14 remplacements, suppression des espaces, décodage base64 mot par mot
+def legacy_extract_emails(text):
+    for variant in LEGACY_AT_VARIANTS:
+        text = text.replace(variant, '@')
+    for variant in LEGACY_DOT_VARIANTS:
+        text = text.replace(variant, '.')
+    text = text.replace(' ', '')
+    words = text.split()
+    for i, word in enumerate(words):
+        if legacy_is_base64(word):
+            try:
+                words[i] = base64.b64decode(word).decode('utf-8')
+            except Exception:
+                continue
+    text = ' '.join(words)
+    emails = set()
+    for match in re.finditer(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text):
+        emails.add((match.group(), text[max(match.start() - 500, 0):match.end() + 500]))
+    return emails
+
+def benchmark_email_extraction(pages, repeat):
+    texts = [CompanyCraw.PageAnalysis(html).visible_text(separator='\n') for html in pages]
+    size_bytes = sum(len(text.encode('utf-8')) for text in texts)
+    legacy_found = sum(len({email for email, _ in legacy_extract_emails(text)}) for text in texts)
+    found = sum(len({email for email, _ in CompanyCraw.extract_emails(text, [])}) for text in texts)
+    timings = {
+        "clean_text_for_emails (legacy)": time_call(legacy_extract_emails, texts, repeat),
+        "EmailExtractor.scan_emails": time_call(lambda text: CompanyCraw.extract_emails(text, []), texts, repeat),
+    }
+    report(f"Email extraction ({len(texts)} pages, {size_bytes / 1e6:.1f} MB, {legacy_found} emails before, {found} after)", timings, size_bytes)
+
+# Pages qui lançaient un navigateur pour les liens mailto, avant et après la résolution statique
+def benchmark_mailto_resolution(pages, repeat):
+    analyses = [CompanyCraw.PageAnalysis(html) for html in pages]
+    launches_before = sum(1 for page in analyses if page.mailto_elements)
+    launches_after = sum(1 for page in analyses if page.needs_browser_for_mailto)
+    resolved = sum(len(page.static_mailto_emails) for page in analyses)
+
+    def resolve(html):
+        page = CompanyCraw.PageAnalysis(html)
+        page.static_mailto_emails
+        page.needs_browser_for_mailto
+
+    timings = {"static mailto resolution": time_call(resolve, pages, repeat)}
+    report(f"Mailto resolution ({len(pages)} pages, {resolved} addresses resolved offline, "
+           f"browser launches {launches_before} before, {launches_after} after)", timings)
+
+# Le corpus est traité comme un seul site : texte envoyé au résumé avant (10 000 premiers caractères) et après préparation
+def benchmark_text_preparation(pages, repeat):
+    analyses = [CompanyCraw.PageAnalysis(html) for html in pages]
+    site_blocks = [page.text_blocks for page in analyses]
+    legacy_text = " ".join(page.visible_text() for page in analyses)[:10000]
+    preparer = TextPreparer()
+    chunks = preparer.prepare(site_blocks)
+
+    def prepare(_):
+        TextPreparer().prepare(site_blocks)
+
+    timings = {"text preparation": time_call(prepare, [None], repeat)}
+    report(f"Text preparation ({len(pages)} pages, {preparer.duplicate_blocks} of {preparer.blocks_in} blocks repeated, "
+           f"{count_tokens(legacy_text)} tokens before, {sum(count_tokens(chunk) for chunk in chunks)} after)", timings)
+
+BENCHMARKS = {
+    'page_analysis': benchmark_page_analysis,
+    'link_classification': benchmark_link_classification,
+    'email_extraction': benchmark_email_extraction,
+    'mailto_resolution': benchmark_mailto_resolution,
+    'text_preparation': benchmark_text_preparation,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the crawler on saved HTML pages.")
+    parser.add_argument('corpus', nargs='?', default=os.path.join('Cache', 'http'), help="Folder of .html files or HTTP cache entries")
+    parser.add_argument('--only', choices=sorted(BENCHMARKS), action='append', help="Run only the given benchmark(s)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    if not pages:
+        print(f"No saved pages found in {args.corpus}, using synthetic pages.")
+        pages = [synthetic_page(seed=seed) for seed in range(20)]
+
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](pages, args.repeat)
+
+if __name__ == "__main__":
+    sys.exit(main())
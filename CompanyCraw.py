@@ -1,20 +1,57 @@
 import os
 import re
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, Error as PlaywrightError
 from pathlib import Path
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, CData, Tag
 from urllib.parse import urljoin, urlparse
 import json
-from groq import Groq
-from langdetect import detect, LangDetectException
-import base64
 import time
 import asyncio
+import heapq
+import itertools
 import aiohttp
-from email_validator import validate_email, EmailNotValidError
+import argparse
+from contextlib import asynccontextmanager
+from functools import cached_property, lru_cache
+from UrlCanonicalizer import canonicalize_url, url_key
+from HttpCache import HttpCache, CACHE_MAX_AGE
+from EmailExtractor import scan_emails, merge_context_windows, decode_cfemail, mailto_targets, script_emails
+from DeliverabilityChecker import DeliverabilityChecker, StubResolver
+from PageLoadPolicy import PageLoadPolicy, READINESS_STRATEGIES
+from FetchStrategyTable import FetchStrategyTable
+from RetryPolicy import RetryPolicy, RETRYABLE, classify_status, classify_exception, parse_retry_after
+from LLMClient import AsyncLLMClient
+from LLMCache import LLMCache
+from TextPreparer import TextPreparer, SUMMARY_TOKEN_BUDGET
+from LanguageDetector import LanguageDetector, LANGUAGE_BACKENDS
+from DataStore import DataStore, json_path
+from CompanyReader import iter_companies
+
+# Utiliser lxml comme analyseur HTML s'il est installé (nettement plus rapide que html.parser)
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 RETRY_ATTEMPTS = 5
-RETRY_DELAY = 3
+BROWSER_MAX_PAGES = 4  # Nombre maximum de pages ouvertes simultanément dans le navigateur partagé
+BROWSER_RECYCLE_AFTER = 50  # Redémarrer le contexte après ce nombre de pages
+HTTP_MAX_CONNECTIONS = 100  # Limite globale de connexions du pool aiohttp
+HTTP_MAX_CONNECTIONS_PER_HOST = 6  # Limite de connexions simultanées par hôte
+HTTP_KEEPALIVE_TIMEOUT = 30  # Durée de conservation des connexions inactives (secondes)
+HTTP_DNS_CACHE_TTL = 600  # Durée de vie du cache DNS (secondes)
+SITE_WORKERS = 1  # Nombre de pages d'un même site récupérées en parallèle
+DOMAIN_MIN_DELAY = 1.0  # Délai minimum entre deux requêtes vers un même domaine (secondes) quand ses pages sont récupérées en parallèle
+DOMAIN_MAX_CONCURRENCY = 2  # Nombre maximum de requêtes simultanées vers un même domaine
+FRONTIER_MAX_SIZE = 2000  # Nombre maximum d'URLs en attente dans la frontière d'un site
+LLM_MAX_CONCURRENT_CALLS = 2  # Nombre maximum d'appels simultanés à l'API Groq
+SUMMARY_MODES = ('map-reduce', 'refine')
+SUMMARY_MERGE_FANIN = 4  # Nombre de résumés partiels fusionnés par requête lors de la réduction
+EXTRACTION_BATCH_CHARS = 8000  # Taille maximale des contextes d'e-mails regroupés dans une requête d'extraction (caractères)
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Ubuntu Chromium/78.0.3904.70 Chrome/78.0.3904.70 Safari/537.36'
+}
 
 # Charger l'API key depuis un fichier
 def load_api_key(file_path='groq_api_key.txt'):
@@ -27,7 +64,22 @@ def load_api_key(file_path='groq_api_key.txt'):
 
 # Configuration de l'API Meta3
 api_key = load_api_key()
-client = Groq(api_key=api_key) if api_key else None
+
+# Client LLM asynchrone partagé : le nombre d'appels simultanés est limité, les attentes de limite
+# de débit ne bloquent pas le crawl des autres entreprises et les réponses sont mises en cache sur disque
+llm_client = AsyncLLMClient(api_key, max_concurrent_calls=LLM_MAX_CONCURRENT_CALLS, attempts=RETRY_ATTEMPTS, cache=LLMCache())
+
+# Préparation du texte envoyé au résumé (blocs répétés retirés, budget de jetons par site)
+text_preparer = TextPreparer()
+
+# Détection de langue partagée, mémorisée entre les entreprises et entre les exécutions
+language_detector = LanguageDetector()
+
+# Politique de chargement partagée par toutes les pages du navigateur (requêtes bloquées, critère de fin de rendu)
+page_load_policy = PageLoadPolicy()
+
+# Nouvelles tentatives et disjoncteurs par hôte partagés par toutes les récupérations de pages
+retry_policy = RetryPolicy(attempts=RETRY_ATTEMPTS)
 
 # Fonction pour charger les mots-clés à partir d'un fichier JSON
 def load_lists(json_file_path='Json_Files/lists.json'):
@@ -39,15 +91,19 @@ def load_lists(json_file_path='Json_Files/lists.json'):
         print(f"Error loading lists: {e}")
         return [], []
 
+# Charger les listes de mots-clés et compiler le classificateur de liens une seule fois par fichier
+@lru_cache(maxsize=None)
+def load_keyword_matcher(json_file_path='Json_Files/lists.json'):
+    return KeywordMatcher(*load_lists(json_file_path))
+
+# Entreprises lues au fur et à mesure (tableau JSON, JSONL ou CSV) : la liste n'est jamais chargée entièrement
 def load_company_info(json_file='Json_Files/company_info.json'):
     try:
-        with open(json_file, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        yield from iter_companies(json_file)
     except FileNotFoundError:
-        return []
+        return
     except Exception as e:
         print(f"Error loading company info: {e}")
-        return []
 
 # Fonction pour obtenir les chemins des extensions
 def get_extension_paths(extensions_dir):
@@ -80,98 +136,416 @@ def create_persistent_profile():
 def extract_emails_from_mailto_links(mailto_links):
     emails = []
     for link in mailto_links:
-        match = re.search(r'mailto:([^?]+)', link)
-        if match:
-            emails.append(match.group(1))
+        for email in mailto_targets(link):
+            if email not in emails:
+                emails.append(email)
     return emails
 
+# Pool de navigateur : un seul Chromium par exécution, partagé par toutes les récupérations de pages
+class BrowserPool:
+    def __init__(self, max_pages=BROWSER_MAX_PAGES, recycle_after=BROWSER_RECYCLE_AFTER, headless=True):
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self.launches = 0
+        self._playwright = None
+        self._context = None
+        self._pages_served = 0
+        self._active_pages = 0
+        self._needs_recycle = False
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        async with self._condition:
+            await self._ensure_context()
+
+    async def close(self):
+        async with self._condition:
+            await self._close_context()
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def _mark_for_recycle(self, *_):
+        self._needs_recycle = True
+
+    def _on_context_closed(self, context):
+        # Le navigateur a été fermé ou a planté : il sera relancé à la prochaine demande
+        if context is self._context:
+            self._context = None
+
+    async def _close_context(self):
+        context, self._context = self._context, None
+        if context is not None:
+            try:
+                await context.close()
+            except PlaywrightError as e:
+                print(f"Error closing browser context: {e}")
+
+    # Doit être appelée avec self._condition acquise
+    async def _ensure_context(self):
+        while self._context is None or self._needs_recycle:
+            # Attendre que toutes les pages de l'ancien contexte soient rendues avant de le recycler
+            if self._active_pages:
+                await self._condition.wait()
+                continue
+            await self._close_context()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            user_data_dir, extensions_args = create_persistent_profile()
+            context = await self._playwright.chromium.launch_persistent_context(user_data_dir, headless=self.headless, args=extensions_args)
+            context.on('close', self._on_context_closed)
+            self._context = context
+            self._pages_served = 0
+            self._needs_recycle = False
+            self.launches += 1
+
+    @asynccontextmanager
+    async def page(self):
+        async with self._semaphore:
+            async with self._condition:
+                await self._ensure_context()
+                context = self._context
+                self._active_pages += 1
+                self._pages_served += 1
+                if self._pages_served >= self.recycle_after:
+                    self._needs_recycle = True
+            page = None
+            try:
+                try:
+                    page = await context.new_page()
+                except PlaywrightError:
+                    self._mark_for_recycle()
+                    raise
+                page.on('crash', self._mark_for_recycle)
+                await page_load_policy.install(page)
+                yield page
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except PlaywrightError:
+                        pass
+                async with self._condition:
+                    self._active_pages -= 1
+                    self._condition.notify_all()
+
+# Obtenir une page du pool, ou d'un navigateur temporaire si aucun pool n'est fourni
+@asynccontextmanager
+async def open_page(browser_pool=None):
+    if browser_pool is not None:
+        async with browser_pool.page() as page:
+            yield page
+        return
+    async with BrowserPool(max_pages=1) as pool:
+        async with pool.page() as page:
+            yield page
+
 # Fonction pour capturer les mailto links avec Playwright avec une limite d'essais
-async def capture_mailto_links(url):
-    mailto_requests_urls = []
-    click_attempts = 0  # Initialiser le compteur d'essais de clics
+async def capture_mailto_links(url, browser_pool=None):
     max_clicks = 10  # Limite des clics
 
-    user_data_dir, extensions_args = create_persistent_profile()
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch_persistent_context(user_data_dir, headless=True, args=extensions_args)  # Utiliser un profil utilisateur persistant
-        page = await browser.new_page()
-
-        # Fonction pour capturer les requêtes réseau
-        async def capture_request(request):
-            if 'mailto:' in request.url:
-                mailto_requests_urls.append(request.url)
-
-        # Écouter les événements de requêtes réseau
-        page.on('request', capture_request)
-
-        for attempt in range(RETRY_ATTEMPTS):
+    if not retry_policy.allow(url):
+        return []
+    async with open_page(browser_pool) as page:
+        for attempt in range(retry_policy.attempts):
             try:
-                # Naviguer vers l'URL
-                await page.goto(url, timeout=30000)
-                await page.wait_for_load_state('networkidle')
+                # Naviguer vers l'URL et attendre la fin du rendu
+                await page_load_policy.load(page, url)
+                retry_policy.record_success(url)
                 break  # Sortir de la boucle si la navigation réussit
             except Exception as e:
                 print(f"Error navigating to {url}: {e}")
-                if attempt < RETRY_ATTEMPTS - 1:
-                    print(f"Retrying in {RETRY_DELAY} seconds...")
-                    await asyncio.sleep(RETRY_DELAY)
+                outcome = classify_exception(e)
+                if outcome != RETRYABLE:
+                    retry_policy.record_failure(url, outcome)
+                    return []
+                if attempt < retry_policy.attempts - 1:
+                    await retry_policy.backoff(attempt)
                 else:
-                    print(f"Failed to navigate to {url} after {RETRY_ATTEMPTS} attempts.")
-                    await browser.close()
-                    return mailto_requests_urls
+                    print(f"Failed to navigate to {url} after {retry_policy.attempts} attempts.")
+                    retry_policy.record_failure(url, outcome)
+                    return []
 
-        # Identifier les éléments contenant le mot "mail" dans le texte visible, dans les attributs ou dans le contenu de l'élément
-        mail_elements = await page.query_selector_all('a, button')
-        matching_elements = []
+        emails = await collect_mailto_emails(page, max_clicks)
 
-        for element in mail_elements:
-            element_html = await element.evaluate('(element) => element.outerHTML.toLowerCase()')
-            element_text = await element.evaluate('(element) => element.innerText.toLowerCase()')
-            if "mail" in element_html or "mail" in element_text:
-                matching_elements.append(element)
+    return emails
 
+# Script exécuté dans la page : un seul aller-retour pour repérer les éléments qui mentionnent "mail"
+# et lire leur cible mailto statique (href ou onclick). Les candidats sont marqués pour pouvoir être cliqués ensuite.
+MAILTO_SCAN_SCRIPT = """
+() => {
+    const candidates = [];
+    for (const element of document.querySelectorAll('a, button')) {
+        const html = element.outerHTML.toLowerCase();
+        const text = (element.innerText || '').toLowerCase();
+        if (!html.includes('mail') && !text.includes('mail')) {
+            continue;
+        }
+        const href = element.getAttribute('href') || '';
+        const onclick = element.getAttribute('onclick') || '';
+        let target = null;
+        if (href.trim().toLowerCase().startsWith('mailto:')) {
+            target = href.trim();
+        } else {
+            const match = onclick.match(/mailto:[^'"\\s)]+/i);
+            if (match) {
+                target = match[0];
+            }
+        }
+        element.setAttribute('data-mailto-candidate', String(candidates.length));
+        candidates.push({href: href, onclick: onclick, target: target});
+    }
+    return candidates;
+}
+"""
 
-        for element in matching_elements:
-            if click_attempts >= max_clicks:
-                print("Nombre maximum d'essais de clics atteint.")
-                break
-            try:
-                # Obtenir la bounding box de l'élément
-                bounding_box = await element.bounding_box()
-                if bounding_box:
-                   
-                    # Utiliser des assertions pour vérifier que l'élément est visible et cliquable
-                    await element.scroll_into_view_if_needed()
-                    # Cliquer sur la position centrale de l'élément
-                    bounding_box = await element.bounding_box()
-                    x = bounding_box['x'] + bounding_box['width'] / 2
-                    y = bounding_box['y'] + bounding_box['height'] / 2
-                    await page.mouse.click(x, y)
-                click_attempts += 1  # Incrémenter le compteur d'essais de clics
-            except Exception as e:
-                print(f"Error clicking element: {e}")
-                click_attempts += 1  # Incrémenter le compteur d'essais de clics en cas d'erreur
-        # Fermer le navigateur
-        await browser.close()
+# Récupérer les e-mails mailto d'une page déjà chargée : les cibles statiques sont lues en un seul appel,
+# seuls les éléments sans cible statique sont cliqués
+async def collect_mailto_emails(page, max_clicks=10):
+    mailto_requests_urls = []
+    click_attempts = 0  # Initialiser le compteur d'essais de clics
+
+    # Fonction pour capturer les requêtes réseau
+    async def capture_request(request):
+        if 'mailto:' in request.url:
+            mailto_requests_urls.append(request.url)
 
-        emails = extract_emails_from_mailto_links(list(mailto_requests_urls))
+    candidates = await page.evaluate(MAILTO_SCAN_SCRIPT)
+    static_targets = [candidate['target'] for candidate in candidates if candidate['target']]
+    unresolved = [index for index, candidate in enumerate(candidates) if not candidate['target']]
 
+    if unresolved:
+        # Écouter les événements de requêtes réseau
+        page.on('request', capture_request)
+    for index in unresolved:
+        if click_attempts >= max_clicks:
+            print("Nombre maximum d'essais de clics atteint.")
+            break
+        click_attempts += 1  # Incrémenter le compteur d'essais de clics
+        try:
+            element = await page.query_selector(f'[data-mailto-candidate="{index}"]')
+            if element is None:
+                continue
+            await element.scroll_into_view_if_needed()
+            # Cliquer sur la position centrale de l'élément
+            bounding_box = await element.bounding_box()
+            if bounding_box:
+                x = bounding_box['x'] + bounding_box['width'] / 2
+                y = bounding_box['y'] + bounding_box['height'] / 2
+                await page.mouse.click(x, y)
+        except Exception as e:
+            print(f"Error clicking element: {e}")
+
+    return extract_emails_from_mailto_links(static_targets + mailto_requests_urls)
+
+# Éléments de bloc : les fragments de texte consécutifs d'un même bloc forment un paragraphe
+BLOCK_TAGS = frozenset({
+    'html', 'body', 'div', 'p', 'section', 'article', 'header', 'footer', 'nav', 'aside', 'main', 'address', 'blockquote', 'pre',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th', 'caption', 'form',
+    'fieldset', 'legend', 'label', 'button', 'select', 'option', 'figure', 'figcaption', 'details', 'summary'
+})
+
+# Élément de bloc le plus proche d'un nœud ; blocks mémorise la réponse pour chaque balise déjà rencontrée
+def block_ancestor(element, blocks):
+    path = []
+    parent = element.parent
+    while parent is not None and parent.name not in BLOCK_TAGS:
+        block = blocks.get(id(parent))
+        if block is not None:
+            break
+        path.append(parent)
+        parent = parent.parent
+    else:
+        block = parent
+    for tag in path:
+        blocks[id(tag)] = block
+    return block
+
+# Analyse d'une page : le HTML n'est parsé qu'une seule fois, le texte visible, les liens
+# et les éléments mailto sont calculés à la demande puis conservés
+class PageAnalysis:
+    def __init__(self, html_content, parser=HTML_PARSER):
+        self.html_content = html_content
+        self.parser = parser
+
+    @cached_property
+    def soup(self):
+        soup = BeautifulSoup(self.html_content, self.parser)
+        # Les corrections ne parcourent l'arbre que si le HTML contient ce qu'elles cherchent
+        if CLOUDFLARE_MARKER.search(self.html_content):
+            reveal_cloudflare_emails(soup)
+        if REVERSED_TEXT_MARKER.search(self.html_content):
+            reveal_reversed_text(soup)
+        return soup
+
+    # Un seul parcours de l'arbre donne les fragments de texte visibles (équivalents à soup.stripped_strings)
+    # et leur regroupement par élément de bloc
+    @cached_property
+    def _text_walk(self):
+        fragments = []
+        blocks = []
+        current = None
+        block_cache = {}
+        for element in self.soup.descendants:
+            if type(element) not in (NavigableString, CData):
+                continue
+            text = element.strip()
+            if not text:
+                continue
+            fragments.append(text)
+            block = block_ancestor(element, block_cache)
+            if block is not None and block is current:
+                blocks[-1].append(text)
+            else:
+                blocks.append([text])
+                current = block
+        return fragments, [' '.join(block) for block in blocks]
+
+    @cached_property
+    def text_fragments(self):
+        return self._text_walk[0]
+
+    # Texte visible, équivalent à soup.get_text(separator=separator, strip=True)
+    def visible_text(self, separator=' '):
+        return separator.join(self.text_fragments)
+
+    # Texte visible regroupé par élément de bloc, pour repérer les blocs répétés d'une page à l'autre
+    @cached_property
+    def text_blocks(self):
+        return self._text_walk[1]
+
+    # Liste des liens (href, texte du lien), tirée des éléments cliquables sans reparcourir l'arbre
+    @cached_property
+    def anchors(self):
+        return [(link['href'], ' '.join(text for text in (string.strip() for string in strings) if text))
+                for link, (_, strings) in zip(self.clickable_elements, self.clickable_parts)
+                if link.name == 'a' and link.get('href') is not None]
+
+    # Parcours direct de l'arbre, plus rapide que find_all pour un simple test de nom de balise
+    @cached_property
+    def clickable_elements(self):
+        return [element for element in self.soup.descendants if type(element) is Tag and element.name in ('a', 'button')]
+
+    # Pour chaque élément cliquable, en un seul parcours : mention de "mailto" dans ses attributs ou ceux de
+    # ses descendants, et fragments de texte (équivalents à get_text)
+    @cached_property
+    def clickable_parts(self):
+        return [clickable_parts(element) for element in self.clickable_elements]
+
+    # Éléments cliquables dont les attributs ou le texte mentionnent "mailto"
+    @cached_property
+    def mailto_elements(self):
+        return [element for element, (mailto_attribute, strings) in zip(self.clickable_elements, self.clickable_parts)
+                if mailto_attribute or 'mailto' in ''.join(strings).lower()]
+
+    # Contenu des scripts en ligne (les scripts externes ne sont pas téléchargés)
+    @cached_property
+    def inline_scripts(self):
+        return [script.string for script in self.soup.find_all('script') if not script.get('src') and script.string]
+
+    # Adresses mailto résolues sans navigateur, pour chaque élément mailto (attributs href, onclick...)
+    @cached_property
+    def element_mailto_emails(self):
+        return [static_mailto_emails(element) for element in self.mailto_elements]
+
+    # Adresses générées par les scripts en ligne (concaténations, chaînes inversées, fromCharCode)
+    @cached_property
+    def script_mailto_emails(self):
+        emails = []
+        for script in self.inline_scripts:
+            emails.extend(email for email in script_emails(script) if email not in emails)
+        return emails
+
+    @cached_property
+    def static_mailto_emails(self):
+        emails = []
+        for element_emails in self.element_mailto_emails:
+            emails.extend(email for email in element_emails if email not in emails)
+        emails.extend(email for email in self.script_mailto_emails if email not in emails)
+        return emails
+
+    # Le navigateur n'est nécessaire que si un élément mailto reste sans adresse et qu'aucun script ne la fournit
+    @cached_property
+    def needs_browser_for_mailto(self):
+        return any(not emails for emails in self.element_mailto_emails) and not self.script_mailto_emails
+
+# Attributs d'un élément et de ses descendants qui mentionnent "mailto" (sans re-sérialiser son HTML),
+# et fragments de texte de l'élément
+def clickable_parts(element):
+    mailto_attribute = False
+    strings = []
+    for node in itertools.chain((element,), element.descendants):
+        if type(node) is Tag:
+            if mailto_attribute:
+                continue
+            for value in node.attrs.values():
+                if isinstance(value, list):
+                    value = ' '.join(value)
+                if 'mailto' in value.lower():
+                    mailto_attribute = True
+                    break
+        elif type(node) in (NavigableString, CData):
+            strings.append(node)
+    return mailto_attribute, strings
+
+# Adresses lisibles dans les attributs d'un élément mailto et de ses descendants, sans exécuter la page
+def static_mailto_emails(element):
+    emails = []
+    for tag in itertools.chain([element], element.find_all(True)):
+        for name, value in tag.attrs.items():
+            if isinstance(value, list):
+                value = ' '.join(value)
+            found = mailto_targets(value)
+            # Gestionnaire d'événement ou lien javascript: qui construit l'adresse
+            if not found and (name.startswith('on') or value.lstrip().lower().startswith('javascript:')):
+                found = script_emails(value)
+            emails.extend(email for email in found if email not in emails)
     return emails
 
-async def filter_and_rank_emails(emails, url):
+# Remplacer les adresses protégées par Cloudflare par leur valeur décodée, pour que le texte visible
+# et les liens mailto contiennent la vraie adresse
+def reveal_cloudflare_emails(soup):
+    for element in soup.find_all(attrs={'data-cfemail': True}):
+        email = decode_cfemail(element['data-cfemail'])
+        if email:
+            element.string = email
+    for link in soup.find_all('a', href=re.compile(r'/cdn-cgi/l/email-protection#')):
+        email = decode_cfemail(link['href'].rsplit('#', 1)[-1])
+        if email:
+            link['href'] = f"mailto:{email}"
+
+CLOUDFLARE_MARKER = re.compile(r'data-cfemail|/cdn-cgi/l/email-protection', re.IGNORECASE)
+REVERSED_TEXT_MARKER = re.compile(r'bidi-override', re.IGNORECASE)
+REVERSED_TEXT_STYLE = re.compile(r'(?=.*bidi-override)(?=.*direction\s*:\s*rtl)', re.IGNORECASE | re.DOTALL)
+
+# Remettre à l'endroit le texte inversé par CSS (unicode-bidi: bidi-override; direction: rtl)
+# quand il contient une adresse, pour que le texte visible contienne l'adresse réelle
+def reveal_reversed_text(soup):
+    for element in soup.find_all(style=REVERSED_TEXT_STYLE):
+        text = element.get_text()
+        if '@' in text and any(scan_emails(text[::-1])):
+            element.string = text[::-1]
+
+# Accepter indifféremment du HTML brut ou une page déjà analysée
+def analyze_page(content):
+    return content if isinstance(content, PageAnalysis) else PageAnalysis(content)
+
+async def filter_and_rank_emails(emails, url, email_checker=None):
     if not emails:
         return emails  # Retourner immédiatement si la liste des e-mails est vide
 
-    valid_emails = []
-    for email in emails:
-        try:
-            # Valider et normaliser l'email
-            email_info = validate_email(email, check_deliverability=True)
-            normalized_email = email_info.normalized
-            valid_emails.append(normalized_email)
-        except EmailNotValidError as e:
-            print(f"Invalid email '{email}': {str(e)}")
+    # Valider et normaliser les emails (une seule résolution DNS par domaine, résultats mis en cache)
+    email_checker = email_checker or DeliverabilityChecker()
+    valid_emails = await email_checker.validate_all(emails)
 
     if not valid_emails:
         return valid_emails  # Retourner immédiatement si aucune adresse email valide n'est trouvée
@@ -237,181 +611,308 @@ async def filter_and_rank_emails(emails, url):
 
 
 
-async def extract_emails_with_context(html_content, url,currents_emails, visited_mailto_links):
+# rendered_mailto_emails : adresses déjà capturées sur la page rendue par le navigateur lors de sa récupération
+async def extract_emails_with_context(html_content, url,currents_emails, visited_mailto_links, browser_pool=None, rendered_mailto_emails=None):
     emails_with_context = set()
-    soup = BeautifulSoup(html_content, 'html.parser')
-    visible_text = soup.get_text(separator='\n', strip=True)
-    clickable_elements = soup.find_all(['a', 'button'])
+    page = analyze_page(html_content)
+    visible_text = page.visible_text(separator='\n')
 
     emails_with_context.update(extract_emails(visible_text,currents_emails))
 
-    if clickable_elements:
-        element_str = str(clickable_elements).lower()
-        if "mailto" in element_str:
-            if url not in visited_mailto_links:
-                mailto_emails = await capture_mailto_links(url)
-                for mailto_email in mailto_emails:
-                    if mailto_email not in emails_with_context and mailto_email not in currents_emails:
-                        emails_with_context.add((mailto_email, None))
-                visited_mailto_links.add(url)
+    # Liens mailto résolus hors ligne ; le navigateur n'est lancé que si la résolution statique échoue
+    mailto_emails = page.static_mailto_emails
+    if rendered_mailto_emails is not None:
+        visited_mailto_links.add(url_key(url))
+        mailto_emails = mailto_emails + rendered_mailto_emails
+    elif page.needs_browser_for_mailto and url_key(url) not in visited_mailto_links:
+        visited_mailto_links.add(url_key(url))
+        mailto_emails = mailto_emails + await capture_mailto_links(url, browser_pool)
+    found_emails = {email for email, _ in emails_with_context}
+    for mailto_email in mailto_emails:
+        if mailto_email not in found_emails and mailto_email not in currents_emails:
+            found_emails.add(mailto_email)
+            emails_with_context.add((mailto_email, None))
     return emails_with_context
 
-def is_base64(s):
-    try:
-        return base64.b64encode(base64.b64decode(s)).decode('utf-8') == s
-    except Exception:
-        return False
-    
-# Listes des variantes pour @ et .
-at_variants = ['[at]', '(at)', '{at}', '[AT]', '(AT)', '{AT}', ' at ']
-dot_variants = ['[dot]', '(dot)', '{dot}', '[DOT]', '(DOT)', '{DOT}', ' dot ']
-
-def clean_text_for_emails(text):
-     # Replace obfuscated [at] and [dot]
-    # Remplacer les variantes de @ par @
-    for variant in at_variants:
-        text = text.replace(variant, '@')
-    
-    # Remplacer les variantes de . par .
-    for variant in dot_variants:
-        text = text.replace(variant, '.')
-    
-    text = text.replace(' ', '')
-
-    # Decode base64 encoded strings
-    words = text.split()
-    for i, word in enumerate(words):
-        if is_base64(word):
-            try:
-                decoded_email = base64.b64decode(word).decode('utf-8')
-                words[i] = decoded_email
-            except (base64.binascii.Error, UnicodeDecodeError):
-                continue
-    text = ' '.join(words)
-
-    return ''.join(text)
-
+# Les e-mails dont les contextes se chevauchent reçoivent la même fenêtre fusionnée,
+# pour qu'elle ne soit envoyée qu'une fois au LLM
 def extract_emails(text,currents_emails):
-    email_pattern=r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    emails = set()
-    cleaned_text = clean_text_for_emails(text)
-    matches = re.finditer(email_pattern, cleaned_text)
-
-    for match in matches:
-        if match.group() not in emails and match.group() not in currents_emails:
-            email = match.group()
-            start = max(match.start() - 500, 0)
-            end = min(match.end() + 500, len(cleaned_text))
-            email_context = cleaned_text[start:end]
-            emails.add((email, email_context))
+    spans = []
+    seen = set()
+    for email, start, end in scan_emails(text):
+        if email not in seen and email not in currents_emails:
+            seen.add(email)
+            spans.append((email, start, end))
 
+    emails = set()
+    for start, end, window_emails in merge_context_windows(spans, len(text)):
+        context = text[start:end]
+        emails.update((email, context) for email in window_emails)
     return emails
 
-async def fetch_page_with_aiohttp(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Ubuntu Chromium/78.0.3904.70 Chrome/78.0.3904.70 Safari/537.36'
-    }
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(RETRY_ATTEMPTS):
-            try:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        print(f"HTTP error {response.status} while fetching {url}")
-            except aiohttp.ClientError as e:
-                print(f"Error fetching {url}: {e}")
-            if attempt < RETRY_ATTEMPTS - 1:
-                print(f"Retrying in {RETRY_DELAY} seconds...")
-                await asyncio.sleep(RETRY_DELAY)
-            else:
-                print(f"Failed to fetch {url} after {RETRY_ATTEMPTS} attempts.")
+# Statistiques de réutilisation des connexions du pool aiohttp
+class ConnectionStats:
+    def __init__(self):
+        self.created = 0
+        self.reused = 0
+
+    def trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            self.created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.reused += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def reuse_ratio(self):
+        total = self.created + self.reused
+        return self.reused / total if total else 0.0
+
+    def report(self):
+        print(f"HTTP connections: {self.created} opened, {self.reused} reused (reuse ratio {self.reuse_ratio():.0%})")
+
+# Créer la session HTTP partagée par toute l'exécution
+def create_http_session(stats=None):
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_MAX_CONNECTIONS,
+        limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True
+    )
+    trace_configs = [stats.trace_config()] if stats else None
+    return aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, trace_configs=trace_configs)
+
+# count_failure=False : l'épuisement des tentatives n'est pas compté pour le disjoncteur, l'appelant le compte
+# lui-même si le repli échoue aussi (une seule défaillance par URL)
+async def fetch_page_with_aiohttp(url, session=None, cache=None, strategies=None, count_failure=True):
+    if session is None:
+        async with create_http_session() as session:
+            return await fetch_page_with_aiohttp(url, session, cache, strategies, count_failure)
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        return cache.hit(entry)
+    if not retry_policy.allow(url) or retry_policy.is_missing(url):
+        return None
+    headers = cache.validation_headers(entry) if entry else {}
+    for attempt in range(retry_policy.attempts):
+        retry_after = None
+        try:
+            async with session.get(url, headers=headers) as response:
+                if strategies:
+                    strategies.record_status(url, response.status)
+                if response.status == 304 and entry:
+                    return cache.refresh(url, entry)
+                if response.status == 200:
+                    content = await response.text()
+                    if cache:
+                        cache.store(url, content, 'aiohttp', response.headers)
+                    if strategies:
+                        strategies.record_success(url, 'aiohttp')
+                    retry_policy.record_success(url)
+                    return content
+                else:
+                    print(f"HTTP error {response.status} while fetching {url}")
+                    outcome = classify_status(response.status)
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching {url}: {e}")
+            outcome = classify_exception(e)
+        # Erreur définitive (404, 410, DNS, TLS...) : inutile de réessayer
+        if outcome != RETRYABLE:
+            retry_policy.record_failure(url, outcome)
+            return None
+        if attempt < retry_policy.attempts - 1:
+            await retry_policy.backoff(attempt, retry_after)
+        else:
+            print(f"Failed to fetch {url} after {retry_policy.attempts} attempts.")
+            if count_failure:
+                retry_policy.record_failure(url, outcome)
     return None
 
-async def fetch_page_with_playwright(url):
-    user_data_dir, extensions_args = create_persistent_profile()
+# Revalider une page rendue par Playwright avec une requête conditionnelle légère (une seule tentative)
+async def revalidate_with_aiohttp(url, entry, session, cache):
+    headers = cache.validation_headers(entry)
+    if not headers or session is None:
+        return None
+    try:
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304:
+                return cache.refresh(url, entry)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Error revalidating {url}: {e}")
+    return None
 
+# on_rendered(page, content) est appelée tant que la page rendue est encore ouverte, pour la réutiliser
+# (capture des liens mailto) sans naviguer une seconde fois vers la même URL
+async def fetch_page_with_playwright(url, browser_pool=None, cache=None, session=None, on_rendered=None):
+    entry = cache.get(url) if cache else None
+    if entry:
+        if cache.is_fresh(entry):
+            return cache.hit(entry)
+        content = await revalidate_with_aiohttp(url, entry, session, cache)
+        if content:
+            return content
+    if not retry_policy.allow(url):
+        return None
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch_persistent_context(user_data_dir, headless=True, args=extensions_args)
-            page = await browser.new_page()
-            await page.goto(url, timeout=30000)
-            await page.wait_for_load_state('networkidle')
+        async with open_page(browser_pool) as page:
+            response = await page_load_policy.load(page, url)
+            retry_policy.record_success(url)
             content = await page.content()
-            await browser.close()
+            if cache:
+                cache.store(url, content, 'playwright', response.headers if response else None)
+            if on_rendered:
+                try:
+                    await on_rendered(page, content)
+                except Exception as e:
+                    print(f"Error processing rendered page {url}: {e}")
             return content
     except Exception as e:
         print(f"Error fetching {url} with Playwright: {e}")
+        # Un rendu lent n'est pas réessayé : seul un échec définitif (DNS, TLS...) est compté ici
+        outcome = classify_exception(e)
+        if outcome != RETRYABLE:
+            retry_policy.record_failure(url, outcome)
         return None
 
-async def fetch_page_with_fallback(url, use_playwright=False):
+# La méthode qui a fonctionné pour le domaine est mémorisée dans strategies : les pages suivantes du domaine,
+# y compris lors des prochaines exécutions, sont récupérées directement avec elle
+async def fetch_page_with_fallback(url, use_playwright=False, browser_pool=None, session=None, cache=None, on_rendered=None, strategies=None):
+    if not use_playwright and strategies and strategies.preferred_method(url) == 'playwright':
+        strategies.use_preferred()
+        use_playwright = True
     if use_playwright:
-        return await fetch_page_with_playwright(url)
+        return await fetch_page_with_playwright(url, browser_pool, cache, session, on_rendered)
     try:
-        content = await fetch_page_with_aiohttp(url)
+        content = await fetch_page_with_aiohttp(url, session, cache, strategies, count_failure=False)
         if content:
             return content
+        # Page inexistante ou hôte coupé par le disjoncteur : le navigateur n'obtiendrait rien de plus
+        if retry_policy.is_missing(url) or not retry_policy.allow(url):
+            return None
         print(f"Failed to fetch {url} with aiohttp, falling back to Playwright...")
-        content = await fetch_page_with_playwright(url)
+        content = await fetch_page_with_playwright(url, browser_pool, cache, session, on_rendered)
         if content:
             print(f"Fetched {url} with Playwright successfully.")
-            use_playwright = True
+            if strategies:
+                strategies.record_fallback(url)
             return content
+        # aiohttp et Playwright ont échoué : une seule défaillance est comptée pour cette URL
+        if not retry_policy.is_open(url) and not retry_policy.is_missing(url):
+            retry_policy.record_failure(url, RETRYABLE)
     except Exception as e:
         print(f"Error in fetch_page_with_fallback: {e}")
     return None
 
+NON_LETTER_PATTERN = re.compile(r'[^a-zA-Z]')
+
 # Fonction pour normaliser les textes en minuscules et remplacer les caractères non alphabétiques par des espaces
 def normalize_text(text):
-    return re.sub(r'[^a-zA-Z]', ' ', text).lower()
+    return NON_LETTER_PATTERN.sub(' ', text).lower()
+
+# Classificateur de liens compilé une seule fois : les mots-clés normalisés de chaque catégorie sont
+# regroupés dans une seule expression régulière, et un passage donne la catégorie, le mot-clé et le score
+class KeywordMatcher:
+    def __init__(self, *keyword_lists):
+        self.patterns = []
+        self.exact_entries = {}
+        for category, keywords in enumerate(keyword_lists):
+            for keyword in keywords:
+                self.exact_entries.setdefault(keyword, category)
+            normalized = {normalize_text(keyword) for keyword in keywords}
+            # Les mots-clés les plus longs d'abord pour que "jobs" l'emporte sur "job"
+            ordered = sorted((keyword for keyword in normalized if keyword.strip()), key=len, reverse=True)
+            self.patterns.append(re.compile('|'.join(re.escape(keyword) for keyword in ordered)) if ordered else None)
+
+    # Retourne (catégorie, mot-clé, score) ou None si le lien ne correspond à aucune catégorie
+    def match(self, url, text=''):
+        # Aucun mot-clé normalisé ne contient de retour à la ligne : il ne peut pas chevaucher l'URL et le texte
+        normalized = normalize_text(url) + '\n' + normalize_text(text)
+        for category, pattern in enumerate(self.patterns):
+            if pattern is None:
+                continue
+            found = pattern.findall(normalized)
+            if found:
+                return category, found[0], len(set(found))
+        if url in self.exact_entries:
+            return self.exact_entries[url], url, 0
+        return None
 
-# Fonction pour vérifier si un lien ou son texte contient un mot-clé d'une catégorie donnée
-def contains_keyword(url, text, keywords):
-    normalized_url = normalize_text(url)
-    normalized_text = normalize_text(text)
-    return any(normalize_text(keyword) in normalized_url or normalize_text(keyword) in normalized_text for keyword in keywords)
+# Frontière de crawl d'un site : tas ordonné par catégorie, profondeur puis score de mots-clés.
+# Les URLs sont dédoublonnées à l'insertion, aucune URL n'est donc mise en file deux fois.
+# Une frontière est créée pour chaque site (crawl_website) et libérée avec lui : l'ensemble des URLs vues n'est
+# pas borné, mais ne contient que les liens internes des max_pages pages visitées de ce site.
+class CrawlFrontier:
+    def __init__(self, max_size=FRONTIER_MAX_SIZE):
+        self.max_size = max_size
+        self._heap = []
+        self._seen = set()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url, category, depth=0, score=0):
+        key = url_key(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        heapq.heappush(self._heap, (category, depth, -score, next(self._counter), url))
+        # Borner la mémoire : ne conserver que les meilleures entrées (une liste triée reste un tas valide)
+        if len(self._heap) > 2 * self.max_size:
+            self._heap = heapq.nsmallest(self.max_size, self._heap)
+        return True
+
+    def pop(self):
+        if not self._heap:
+            return None
+        category, depth, _, _, url = heapq.heappop(self._heap)
+        return url, category, depth
 
 # Fonction pour analyser une page et trouver des liens internes classés par catégories
-async def get_internal_links(base_url, html_content, list_1, list_2, initial_attempt=True):
+# Retourne deux dictionnaires {url: score de mots-clés}
+async def get_internal_links(base_url, html_content, matcher, initial_attempt=True, store=None):
     parsed_base_url = urlparse(base_url)
-    base_domain = parsed_base_url.netloc
-    soup = BeautifulSoup(html_content, 'html.parser')
-    cat1_links = set()
-    cat2_links = set()
+    base_domain = parsed_base_url.netloc.lower()
+    page = analyze_page(html_content)
+    cat1_links = {}
+    cat2_links = {}
+    # URL visitée (première forme rencontrée) et forme canonique de chaque page, par clé url_key :
+    # la forme canonique sert aux vérifications, au dédoublonnage et à l'enregistrement des liens classés
+    urls_by_key = {}
+    canonical_urls = {}
 
     # Rechercher toutes les balises <a> avec l'attribut href
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        link_text = link.get_text(separator=' ', strip=True)
+    for href, link_text in page.anchors:
         # Construire l'URL complète en utilisant urljoin
         full_url = urljoin(base_url, href)
-
-        parsed_full_url = urlparse(full_url)
-        if base_domain in parsed_full_url.netloc:
-            if not has_extension(full_url):
-                if contains_keyword(full_url, link_text, list_1):
-                    cat1_links.add(full_url)
-                elif contains_keyword(full_url, link_text, list_2) or full_url in list_2:
-                    cat2_links.add(full_url)
+        canonical_url = canonicalize_url(full_url)
+        key = url_key(canonical_url)
+        full_url = urls_by_key.setdefault(key, full_url)
+        canonical_urls.setdefault(full_url, canonical_url)
+
+        parsed_canonical_url = urlparse(canonical_url)
+        if base_domain in parsed_canonical_url.netloc:
+            if not has_extension(canonical_url):
+                match = matcher.match(canonical_url, link_text)
+                if match and match[0] < 2:
+                    category, _, score = match
+                    links = cat1_links if category == 0 else cat2_links
+                    links[full_url] = max(score, links.get(full_url, 0))
 
     # Si aucun lien trouvé lors de la tentative initiale, utiliser Playwright pour récupérer le contenu
     if initial_attempt and not cat1_links and not cat2_links:
         return cat1_links, cat2_links
 
-    # Charger les liens existants à partir du fichier classified_links.json
-    try:
-        with open('classified_links.json', 'r', encoding='utf-8') as file:
-            existing_links = json.load(file)
-    except FileNotFoundError:
-        existing_links = {"cat1_links": [], "cat2_links": []}
-
-    # Mettre à jour les liens existants avec les nouveaux liens trouvés
-    existing_links["cat1_links"] = list(set(existing_links["cat1_links"]) | cat1_links)
-    existing_links["cat2_links"] = list(set(existing_links["cat2_links"]) | cat2_links)
-
-    # Enregistrer les liens mis à jour dans le fichier classified_links.json
-    with open('classified_links.json', 'w', encoding='utf-8') as file:
-        json.dump(existing_links, file, ensure_ascii=False, indent=4)
+    # Ajouter les nouveaux liens classés à la base (seuls les liens inconnus sont écrits)
+    if store:
+        store.add_classified_links([canonical_urls[url] for url in cat1_links], [canonical_urls[url] for url in cat2_links])
 
     return cat1_links, cat2_links
 
@@ -440,108 +941,228 @@ def extract_text_within_braces(text):
         print(f"Error extracting text within braces: {e}")
         return ""
 
-def extract_address(context, company_name):
-    result = extract_information(context, company_name)
+# Décoder la réponse d'une extraction simple, ou None si elle n'est pas du JSON valide
+def parse_information(result):
     try:
-        clean_result = clean_json_string(result)
-        json_str = extract_text_within_braces(clean_result)
-        return json.loads(json_str)
-    except (ValueError, json.JSONDecodeError) as e:
-        print(f"Error extracting or decoding JSON: {e}")
+        data = json.loads(extract_text_within_braces(clean_json_string(result)))
+    except (ValueError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+async def extract_address(context, company_name):
+    result = await extract_information(context, company_name)
+    information = parse_information(result)
+    if information is not None:
+        return information
+    print("Error extracting or decoding JSON, retrying")
+    # Nouvel échantillon : la réponse invalide n'a pas été mise en cache, mais le prompt corrigé ne doit pas non plus
+    # réutiliser une ancienne réponse
+    corrected_result = await extract_information(
+        context + " The previous output was not in the correct JSON format. Please ensure the JSON is properly formatted.", company_name,
+        refresh_cache=True
+    )
+    information = parse_information(corrected_result)
+    if information is not None:
+        return information
+    print("Error extracting or decoding JSON after retry")
+    return {"addresses": [], "names_and_roles": []}
+
+# Décoder la réponse d'une extraction groupée : une information par extrait, ou None si la réponse est inexploitable
+def parse_batch_information(result, count):
+    data = None
+    for candidate in (result, clean_json_string(result)):
         try:
-            corrected_result = extract_information(
-                context + " The previous output was not in the correct JSON format. Please ensure the JSON is properly formatted.", company_name
-            )
-            clean_result = clean_json_string(corrected_result)
-            json_str = extract_text_within_braces(clean_result)
-            return json.loads(json_str)
-        except (ValueError, json.JSONDecodeError) as e:
-            print(f"Error extracting or decoding JSON after retry: {e}")
-            return {"addresses": [], "names_and_roles": []}
-
-def chunk_text(text, chunk_size):
-    words = text.split()
-    for i in range(0, len(words), chunk_size):
-        yield ' '.join(words[i:i + chunk_size])
+            data = json.loads(extract_text_within_braces(candidate))
+            break
+        except (ValueError, json.JSONDecodeError):
+            continue
+    entries = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return None
+    informations = [{"addresses": [], "names_and_roles": []} for _ in range(count)]
+    for entry in entries:
+        index = entry.get("excerpt") if isinstance(entry, dict) else None
+        if isinstance(index, int) and 1 <= index <= count:
+            informations[index - 1] = {
+                "addresses": entry.get("addresses") or [],
+                "names_and_roles": entry.get("names_and_roles") or []
+            }
+    return informations
+
+# Extraire les adresses et les personnes clés de plusieurs contextes en une seule requête
+async def extract_addresses_batch(contexts, company_name):
+    if len(contexts) == 1:
+        return [await extract_address(contexts[0], company_name)]
+    result = await extract_batch_information(contexts, company_name)
+    informations = parse_batch_information(result, len(contexts))
+    if informations is None:
+        print("Error decoding batched extraction, extracting contexts one by one")
+        informations = [await extract_address(context, company_name) for context in contexts]
+    return informations
+
+def batch_contexts(contexts, max_chars=EXTRACTION_BATCH_CHARS):
+    batch, size = [], 0
+    for context in contexts:
+        if batch and size + len(context) > max_chars:
+            yield batch
+            batch, size = [], 0
+        batch.append(context)
+        size += len(context)
+    if batch:
+        yield batch
+
+# Extraction groupée de tous les contextes d'e-mails d'un site (email_contexts : {contexte: [emails]}).
+# Les résultats de chaque contexte sont rattachés aux e-mails qu'il contient.
+async def extract_site_information(email_contexts, company_name, addresses, names, processed_emails):
+    batches = list(batch_contexts(list(email_contexts)))
+    results = await asyncio.gather(*(extract_addresses_batch(batch, company_name) for batch in batches))
+    for batch, informations in zip(batches, results):
+        for context, information in zip(batch, informations):
+            merge_information(information, addresses, names)
+            for email in email_contexts[context]:
+                processed_emails[email] = information
+
+# Ajouter à la frontière les liens classés d'une page (catégorie 1 : contact/carrière, catégorie 2 : autres)
+def enqueue_links(frontier, cat1_links, cat2_links, depth):
+    for category, links in enumerate((cat1_links, cat2_links)):
+        for url, score in links.items():
+            frontier.push(url, category, depth, score)
+
+# Politesse par domaine : limite le nombre de requêtes simultanées et impose un délai minimum entre deux requêtes
+class DomainThrottle:
+    def __init__(self, min_delay=DOMAIN_MIN_DELAY, max_concurrency=DOMAIN_MAX_CONCURRENCY):
+        self.min_delay = min_delay
+        self.max_concurrency = max_concurrency
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        domain = urlparse(url).netloc.lower()
+        if domain not in self._semaphores:
+            self._semaphores[domain] = asyncio.Semaphore(self.max_concurrency)
+            self._locks[domain] = asyncio.Lock()
+            self._next_start[domain] = 0.0
+        async with self._semaphores[domain]:
+            async with self._locks[domain]:
+                wait_time = self._next_start[domain] - time.monotonic()
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                self._next_start[domain] = time.monotonic() + self.min_delay
+            yield
+
+# Délai par défaut entre deux requêtes vers un même domaine : un parcours séquentiel (un seul worker par site)
+# envoie déjà une requête à la fois, l'attente n'est imposée que lorsque les pages sont récupérées en parallèle
+def default_domain_delay(site_workers):
+    return 0.0 if site_workers <= 1 else DOMAIN_MIN_DELAY
 
 # Fonction principale pour parcourir le site et extraire les e-mails et adresses
-async def crawl_website(base_url, max_pages):
+# Jusqu'à `workers` pages du site sont récupérées en parallèle, les liens de catégorie 1 restant prioritaires
+async def crawl_website(base_url, max_pages, browser_pool=None, session=None, workers=SITE_WORKERS, throttle=None, cache=None, email_checker=None, strategies=None, store=None):
     visited_urls = set()
     emails = []
     addresses = []
     names = []
     processed_emails = {}
+    email_contexts = {}
     summary_texts = []
     visited_mailto_ref = set()
-    use_playwright = False
+    # Site dont les liens n'apparaissent qu'avec JavaScript lors d'une exécution précédente
+    use_playwright = strategies.needs_js(base_url) if strategies else False
+    throttle = throttle or DomainThrottle(min_delay=default_domain_delay(workers))
+    #extract the name of the site web in the base_url : exemple : www.google.com => google
+    url_parts = base_url.split('.')
+    company_name = url_parts[1] if len(url_parts) > 1 else urlparse(base_url).netloc
 
-    list_1, list_2 = load_lists("Json_Files/lists.json")
+    matcher = load_keyword_matcher("Json_Files/lists.json")
 
-    html_content = await fetch_page_with_fallback(base_url, use_playwright)
+    async with throttle.slot(base_url):
+        html_content = await fetch_page_with_fallback(base_url, use_playwright, browser_pool, session, cache, strategies=strategies)
     
-    to_visit = [[] for _ in range(2)]
-    to_visit[0].append(base_url)
+    frontier = CrawlFrontier()
+    frontier.push(base_url, 0)
     if html_content:
-        cat1_links, cat2_links = await get_internal_links(base_url, html_content, list_1, list_2, initial_attempt=True)
-        if not cat1_links and not cat2_links:
+        cat1_links, cat2_links = await get_internal_links(base_url, html_content, matcher, initial_attempt=True, store=store)
+        if not cat1_links and not cat2_links and not use_playwright:
             print("No internal links found on the main page. Using Playwright to fetch more links.")
-            html_content = await fetch_page_with_playwright(base_url)
-            cat1_links, cat2_links = await get_internal_links(base_url, html_content, list_1, list_2, initial_attempt=False)
+            async with throttle.slot(base_url):
+                html_content = await fetch_page_with_playwright(base_url, browser_pool)
+                if html_content and cache:
+                    cache.store(base_url, html_content, 'playwright')
+            cat1_links, cat2_links = await get_internal_links(base_url, html_content, matcher, initial_attempt=False, store=store)
             if cat1_links or cat2_links:
                 print("Internal links found using Playwright.")
                 use_playwright = True
-        to_visit[0].extend(list(cat1_links))
-        to_visit[1].extend(list(cat2_links))
-
-    current_category = 0
-
-    count = 0
-    while any(to_visit) and len(visited_urls) < max_pages:
-        while current_category < len(to_visit) and to_visit[current_category] and len(visited_urls) < max_pages:
-            count += 1
-            current_url = to_visit[current_category].pop(0)
+                if strategies:
+                    strategies.mark_js_needed(base_url)
+        enqueue_links(frontier, cat1_links, cat2_links, 1)
+
+    async def visit(current_url, category, depth):
+        rendered = {}
+
+        # Page rendue par le navigateur : elle est analysée et ses liens mailto sont cliqués sur place
+        async def capture_rendered_page(browser_page, content):
+            rendered['page'] = PageAnalysis(content)
+            if category == 0 and rendered['page'].needs_browser_for_mailto:
+                rendered['mailto_emails'] = await collect_mailto_emails(browser_page)
+
+        async with throttle.slot(current_url):
+            html_content = await fetch_page_with_fallback(current_url, use_playwright, browser_pool, session, cache, capture_rendered_page, strategies)
+        if not html_content:
+            return
+        print(f"Visiting: {current_url}")          
+        page = rendered.get('page') or PageAnalysis(html_content)
+
+        if category == 0:
+            emails_with_context = await extract_emails_with_context(page, current_url,emails , visited_mailto_ref, browser_pool, rendered.get('mailto_emails'))
+            for email, context in emails_with_context:
+                print(f"Email found: {email}")
+                if email not in processed_emails and context:
+                    processed_emails[email] = None
+                    email_contexts.setdefault(context, []).append(email)
+                if email not in emails:
+                    emails.append(email)
+
+        summary_texts.append(page.text_blocks)
+
+        cat1_links, cat2_links = await get_internal_links(current_url, page, matcher, initial_attempt=True, store=store)
+        enqueue_links(frontier, cat1_links, cat2_links, depth + 1)
+
+    condition = asyncio.Condition()
+    in_flight = 0
+
+    async def worker():
+        nonlocal in_flight
+        while True:
+            async with condition:
+                while True:
+                    if len(visited_urls) >= max_pages:
+                        return
+                    item = frontier.pop()
+                    if item:
+                        break
+                    # Plus rien à visiter et aucune page en cours ne peut en ajouter
+                    if in_flight == 0:
+                        return
+                    await condition.wait()
+                visited_urls.add(url_key(item[0]))
+                in_flight += 1
+            try:
+                await visit(*item)
+            except Exception as e:
+                print(f"Error visiting {item[0]}: {e}")
+            finally:
+                async with condition:
+                    in_flight -= 1
+                    condition.notify_all()
 
-            if current_url in visited_urls:
-                continue
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
 
-            visited_urls.add(current_url)
-            
-            html_content = await fetch_page_with_fallback(current_url, use_playwright)
-            if html_content:
-                print(f"Visiting: {current_url}")          
-                soup = BeautifulSoup(html_content, 'html.parser')
-                visible_text = soup.get_text(separator=' ', strip=True)
-                
-                if current_category == 0 or current_url in cat1_links:
-                    emails_with_context = await extract_emails_with_context(html_content, current_url,emails , visited_mailto_ref)
-                    for email, context in emails_with_context:
-                        print(f"Email found: {email}")
-                        if email not in processed_emails and context:
-                            #extract the name of the site web in the base_url : exemple : www.google.com => google
-                            company_name = base_url.split('.')[1]
-                            information = process_information(context, addresses, names, company_name)
-                            processed_emails[email] = information
-                        if email not in emails:
-                            emails.append(email)
-                
-                if current_category == 0 or current_url in cat2_links:
-                    summary_texts.append(visible_text)
-                
-                cat1_links, cat2_links = await get_internal_links(current_url, html_content, list_1, list_2, initial_attempt=True)
-                to_visit[0].extend(list(cat1_links - visited_urls))
-                to_visit[1].extend(list(cat2_links - visited_urls))
-            
-            current_category += 1
-            if current_category >= len(to_visit):
-                break
-
-        # Reset current_category to start again
-        if to_visit[0]:
-            current_category = 0
-        else:
-            current_category = 1
+    # Une extraction groupée pour tous les contextes d'e-mails du site, au lieu d'un appel par e-mail
+    await extract_site_information(email_contexts, company_name, addresses, names, processed_emails)
 
-    emails = await filter_and_rank_emails(emails, base_url)
+    emails = await filter_and_rank_emails(emails, base_url, email_checker)
 
     print(f"final emails found: {emails}")
 
@@ -549,9 +1170,13 @@ async def crawl_website(base_url, max_pages):
 
 
 
-def process_information(context, addresses, names, company_name):
-    information = extract_address(context, company_name)
+async def process_information(context, addresses, names, company_name):
+    information = await extract_address(context, company_name)
+    merge_information(information, addresses, names)
+    return information
 
+# Ajouter les adresses et les noms extraits aux listes de l'entreprise, sans doublons
+def merge_information(information, addresses, names):
     unique_addresses = set(addresses)
     unique_names = set(names)
 
@@ -568,190 +1193,137 @@ def process_information(context, addresses, names, company_name):
     addresses[:] = list(unique_addresses)
     names[:] = list(unique_names)
 
-    return information
-
-# Fonction pour détecter la langue du contenu
+# Fonction pour détecter la langue du contenu (résultat mémorisé par empreinte du texte)
 def detect_language(text):
-    try:
-        return detect(text)
-    except LangDetectException:
-        return "en"
+    return language_detector.detect(text)
 
 def check_for_info_tag(summary_response):
     return "@info@" in summary_response
 
-# Fonction pour extraire le temps d'attente depuis le message d'erreur
-def extract_wait_time(error_message):
-    match = re.search(r'Please try again in (\d+\.?\d*)s', error_message)
-    if match:
-        return float(match.group(1))
-    match = re.search(r'Please try again in (\d+\.?\d*)m', error_message)
-    if match:
-        return float(match.group(1)) * 60
-    match = re.search(r'Please try again in (\d+\.?\d*)h', error_message)
-    if match:
-        return float(match.group(1)) * 3600
-    return None
-    
-def extract_information(context, company_name):
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert in extracting specific information from text and providing structured outputs in JSON format. "
-                            f"Your task is to identify and extract physical addresses and the names of key figures of the company {company_name}, along with their roles from the provided text."
-                            "Ensure the output is accurate and formatted correctly, avoiding redundancy."
-                            f"Do not include any names or addresses that are not related to the company {company_name}."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"From the following text: {context}, extract the physical addresses and person names with their roles. "
-                            "Do not include any post office boxes. Provide the results in the following JSON format: "
-                            "{\"addresses\": [\"address1\", \"address2\", ...], \"names_and_roles\": [\"Person Name, Person Role\", ...]}."
-                            "Do not include addresses that are not related to the company. Exclude any person that is not a key figure in the company. "
-                            "Ensure each name is correctly paired with their role and formatted as \"Person Name, Person Role\" without any extra structure or redundancy."
-                        )
-                    }
-                ],
-                model="llama3-70b-8192",
-            )
-            return chat_completion.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error: {e}")
-            wait_time = extract_wait_time(str(e))
-            if wait_time:
-                print(f"Rate limit exceeded. Waiting for {wait_time} seconds before retrying...")
-                time.sleep(wait_time)
-            else:
-                time.sleep(RETRY_DELAY)
-    return ""
-
-
-def generate_summary(content, language, current_summary=""):
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an expert in summarizing company information. "
-                            "Your task is to create a comprehensive and coherent company description suitable for a cover letter. "
-                            "The description should be detailed and include, if available, the following elements: "
-                            "company history, mission, key products or services, target market, unique selling points, recent achievements, and company culture. "
-                            "If certain details are missing, focus on summarizing the provided information effectively. "
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"### Current summary:\n"
-                            f"{current_summary}\n\n"
-                            f"### Additionnal data to complete the summary:\n"
-                            f"{content}\n\n"
-                            f"### Task:\n"
-                            f"Using the provided information, generate a detailed and coherent company description. "
-                            f"Include the company's history, mission, key products or services, target market, unique selling points, recent achievements, and company culture if available. "
-                            f"If specific details are not available, summarize the given information as effectively as possible. "
-                            f"Output the description in the format: (description)."
-                            f"The final output should be in {language} and enclosed in parentheses ()."
-                            f"If there is a personal name in the Additional data, write @info@ at the right of the description. Outside the parentheses."
-                        )
-                    }
-                ],
-                model="llama3-70b-8192",
-            )
-            response = chat_completion.choices[0].message.content
-            extracted_text = extract_text_within_braces(clean_json_string(response))
-            return extracted_text if extracted_text else response
-        except Exception as e:
-            print(f"Error: {e}")
-            wait_time = extract_wait_time(str(e))
-            if wait_time:
-                print(f"Rate limit exceeded. Waiting for {wait_time} seconds before retrying...")
-                time.sleep(wait_time)
-            else:
-                time.sleep(RETRY_DELAY)
-    return current_summary
+async def extract_information(context, company_name, refresh_cache=False):
+    response = await llm_client.chat(
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are an expert in extracting specific information from text and providing structured outputs in JSON format. "
+                    f"Your task is to identify and extract physical addresses and the names of key figures of the company {company_name}, along with their roles from the provided text."
+                    "Ensure the output is accurate and formatted correctly, avoiding redundancy."
+                    f"Do not include any names or addresses that are not related to the company {company_name}."
+                )
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"From the following text: {context}, extract the physical addresses and person names with their roles. "
+                    "Do not include any post office boxes. Provide the results in the following JSON format: "
+                    "{\"addresses\": [\"address1\", \"address2\", ...], \"names_and_roles\": [\"Person Name, Person Role\", ...]}."
+                    "Do not include addresses that are not related to the company. Exclude any person that is not a key figure in the company. "
+                    "Ensure each name is correctly paired with their role and formatted as \"Person Name, Person Role\" without any extra structure or redundancy."
+                )
+            }
+        ],
+        refresh_cache=refresh_cache,
+        validate=lambda reply: parse_information(reply) is not None,
+    )
+    return response.strip() if response else ""
+
+
+async def generate_summary(content, language, current_summary=""):
+    response = await llm_client.chat(
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are an expert in summarizing company information. "
+                    "Your task is to create a comprehensive and coherent company description suitable for a cover letter. "
+                    "The description should be detailed and include, if available, the following elements: "
+                    "company history, mission, key products or services, target market, unique selling points, recent achievements, and company culture. "
+                    "If certain details are missing, focus on summarizing the provided information effectively. "
+                )
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"### Current summary:\n"
+                    f"{current_summary}\n\n"
+                    f"### Additionnal data to complete the summary:\n"
+                    f"{content}\n\n"
+                    f"### Task:\n"
+                    f"Using the provided information, generate a detailed and coherent company description. "
+                    f"Include the company's history, mission, key products or services, target market, unique selling points, recent achievements, and company culture if available. "
+                    f"If specific details are not available, summarize the given information as effectively as possible. "
+                    f"Output the description in the format: (description)."
+                    f"The final output should be in {language} and enclosed in parentheses ()."
+                    f"If there is a personal name in the Additional data, write @info@ at the right of the description. Outside the parentheses."
+                )
+            }
+        ],
+    )
+    if response is None:
+        return current_summary
+    extracted_text = extract_text_within_braces(clean_json_string(response))
+    return extracted_text if extracted_text else response
+
+# Même extraction que extract_information pour plusieurs extraits numérotés, en une seule requête
+async def extract_batch_information(contexts, company_name):
+    excerpts = "\n\n".join(f"### Excerpt {index}:\n{context}" for index, context in enumerate(contexts, 1))
+    response = await llm_client.chat(
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You are an expert in extracting specific information from text and providing structured outputs in JSON format. "
+                    f"Your task is to identify and extract physical addresses and the names of key figures of the company {company_name}, along with their roles, from each of the provided text excerpts."
+                    "Ensure the output is accurate and formatted correctly, avoiding redundancy."
+                    f"Do not include any names or addresses that are not related to the company {company_name}."
+                )
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"The following numbered excerpts come from the website of {company_name}.\n\n{excerpts}\n\n"
+                    "For each excerpt, extract the physical addresses and person names with their roles. "
+                    "Do not include any post office boxes. Provide the results in the following JSON format, with one entry per excerpt: "
+                    "{\"results\": [{\"excerpt\": 1, \"addresses\": [\"address1\", ...], \"names_and_roles\": [\"Person Name, Person Role\", ...]}, ...]}."
+                    "Do not include addresses that are not related to the company. Exclude any person that is not a key figure in the company. "
+                    "Ensure each name is correctly paired with their role and formatted as \"Person Name, Person Role\" without any extra structure or redundancy."
+                )
+            }
+        ],
+        validate=lambda reply: parse_batch_information(reply, len(contexts)) is not None,
+    )
+    return response.strip() if response else ""
 
 # Fonction pour extraire le nom de l'entreprise à partir du résumé.
-def extract_company_name(summary):
-    for attempt in range(RETRY_ATTEMPTS):
-        try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert in identifying company names from text."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"You must provide only the name of the company, without any preliminary indication, using the following summary: {summary}. "
-                    }
-                ],
-                model="llama3-70b-8192",
-            )
-            return chat_completion.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error: {e}")
-            wait_time = extract_wait_time(str(e))
-            if wait_time:
-                print(f"Rate limit exceeded. Waiting for {wait_time} seconds before retrying...")
-                time.sleep(wait_time)
-            else:
-                time.sleep(RETRY_DELAY)
-    return ""
-
-def load_json_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        return []
-    except Exception as e:
-        print(f"Error loading JSON file: {e}")
-        return []
-
-def save_json_file(data, file_path):
-    try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"Error saving JSON file: {e}")
-
-def update_company_data(result, results_file='Json_Files/results.json', company_info_file='Json_Files/company_info.json', failed_companies_file='Json_Files/failed_companies.json'):
-    existing_results = load_json_file(results_file)
-    company_info_list = load_json_file(company_info_file)
-    failed_companies = load_json_file(failed_companies_file)
-
+async def extract_company_name(summary):
+    response = await llm_client.chat(
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert in identifying company names from text."
+            },
+            {
+                "role": "user",
+                "content": f"You must provide only the name of the company, without any preliminary indication, using the following summary: {summary}. "
+            }
+        ],
+    )
+    return response.strip() if response else ""
+
+# Enregistrer le résultat d'une entreprise : une seule ligne est écrite dans la base, par une transaction
+def update_company_data(result, store):
     if not result.get("mails"):
         print(f"No emails found for {result.get('company_name')}. Ignored.")
         # Mise à jour des compagnies ayant échoué
-        failed_companies.append({
-            "company_name": result.get('company_name', ''),
-            "website": result.get('website', '')
-        })
-        save_json_file(failed_companies, failed_companies_file)
+        store.add_failure(result.get('company_name', ''), result.get('website', ''))
         return
 
-    company_info = None
-    for company in company_info_list:
-        if company["website"] == result["website"]:
-            company_info = company
-            break
+    company_info = store.company(result["website"])
 
     if not company_info:
         print(f"No information found for {result.get('company_name')} in company_info.json. Ignored.")
-        failed_companies.append({
-            "company_name": result.get('company_name', ''),
-            "website": result.get('website', '')
-        })
-        save_json_file(failed_companies, failed_companies_file)
+        store.add_failure(result.get('company_name', ''), result.get('website', ''))
         return
 
     final_result = {
@@ -761,77 +1333,213 @@ def update_company_data(result, results_file='Json_Files/results.json', company_
         "addresses": company_info.get("addresses", []) or result.get("addresses", []),
         "summary": company_info.get("summary", result.get("summary", "")),
         "mails": company_info.get("mails", []) or result.get("mails", []),
-        "personal_names": company_info.get("personal_names", []) or result.get("personal_names", [])
+        "personal_names": company_info.get("personal_names", []) or result.get("personal_names", []),
+        "language": result.get("language", "")
     }
 
-    updated = False
-    for i, existing_result in enumerate(existing_results):
-        if existing_result["website"] == final_result["website"]:
-            existing_results[i] = final_result
-            updated = True
-            break
-
-    if not updated:
-        existing_results.append(final_result)
-
-    save_json_file(existing_results, results_file)
+    store.upsert_result(final_result)
     print(f"Company information updated for {result.get('company_name')}.")
 
 
-async def main(company_info_file='Json_Files/company_info.json', results_file='Json_Files/results.json', max_pages=20):
+async def main(company_info_file='Json_Files/company_info.json', results_file='Json_Files/results.json', max_pages=20, max_browser_pages=BROWSER_MAX_PAGES, concurrency=1, site_workers=SITE_WORKERS, domain_delay=None, cache=None, email_checker=None, strategies=None, summary_mode='map-reduce', store=None):
     company_info = load_company_info(company_info_file)
-    
-    existing_results = load_json_file(results_file)
-    existing_company_names = {result["company_name"] for result in existing_results}
-
-    for company in company_info:
-        base_url = company["website"]
-        
-        if company["company_name"] in existing_company_names:
-            print(f"Skipping {company['company_name']} as it already exists in results.")
-            continue
 
-        print(f"Crawling website: {base_url}")
-        emails, addresses, names, summary_texts = await crawl_website(base_url, max_pages)
-
-        max_length = 10000
-        merged_text = " ".join(summary_texts)[:max_length]
-
-        current_summary = ""
-
-        language = detect_language(merged_text)
-
-        first_summary = True
-
-        chunk_size = 2000
-        for chunk in chunk_text(merged_text, chunk_size):
-            print(f"Text sent to AI (part): {chunk[:chunk_size]}")
-            current_summary = generate_summary(chunk, language, current_summary)
-            if check_for_info_tag(current_summary):
-                current_summary = current_summary.replace("@info@", "")
-                if first_summary:
-                    company_name = extract_company_name(current_summary)
-                    first_summary = False    
-                process_information(chunk, addresses, names, company_name)
-            print(f"Intermediate company summary: {current_summary}")
-
-        company_name = extract_company_name(current_summary)
-
-        print(f"Emails found: {emails}")
-        print(f"Addresses found: {addresses}")
-        print(f"Names found: {names}")
-        print(f"Company name: {company_name}")
-        print(f"Company summary: {current_summary}")
-
-        result = {
-            "company_name": company_name,
-            "summary": current_summary,
-            "mails": list(emails),
-            "addresses": list(addresses),
-            "personal_names": list(names),
-            "website": base_url
-        }
-        update_company_data(result)
+    # Base des entreprises et des résultats : chaque entreprise y est enregistrée au moment de son traitement,
+    # et la présence d'un résultat est vérifiée par l'index des noms
+    store = store or DataStore()
+    # La base est la référence, results.json en est l'export. Un fichier de résultats modifié depuis le dernier
+    # export (à la main, par un autre outil) est réimporté avant l'exécution, pour que l'export final ne perde
+    # pas ces modifications. Un fichier autre que celui par défaut est toujours importé, et ne reçoit à la fin
+    # que ses propres résultats et ceux des entreprises de cette exécution (export_websites).
+    export_websites = None
+    if os.path.abspath(results_file) != os.path.abspath(json_path('results')):
+        export_websites = set(await asyncio.to_thread(store.import_results, results_file))
+    elif await asyncio.to_thread(store.json_modified, results_file):
+        print(f"{results_file} was modified since the last export, importing it")
+        await asyncio.to_thread(store.import_results, results_file)
+
+    # Un seul navigateur et une seule session HTTP pour toute l'exécution, fermés proprement à la fin
+    browser_pool = BrowserPool(max_pages=max_browser_pages)
+    connection_stats = ConnectionStats()
+    session = create_http_session(connection_stats)
+    # Verrou sérialisant l'écriture des résultats entre les entreprises traitées en parallèle
+    results_lock = asyncio.Lock()
+    throttle = DomainThrottle(min_delay=default_domain_delay(site_workers) if domain_delay is None else domain_delay)
+    cache = cache or HttpCache()
+    email_checker = email_checker or DeliverabilityChecker()
+    strategies = strategies or FetchStrategyTable()
+
+    # Les workers se partagent le lecteur d'entreprises : la suivante n'est lue que lorsqu'un worker est libre
+    async def company_worker():
+        for company in company_info:
+            if export_websites is not None:
+                export_websites.add(company.get("website", ""))
+            if await asyncio.to_thread(store.has_result_named, company.get("company_name", "")):
+                print(f"Skipping {company.get('company_name')} as it already exists in results.")
+                continue
+            try:
+                await asyncio.to_thread(store.import_companies, [company])
+                await process_company(company, max_pages, browser_pool, session, results_lock, site_workers, throttle, cache, email_checker, strategies, summary_mode, store)
+            except Exception as e:
+                print(f"Error processing {company.get('company_name')}: {e}")
+
+    try:
+        await asyncio.gather(*(company_worker() for _ in range(max(1, concurrency))))
+    finally:
+        await session.close()
+        await browser_pool.close()
+        print(f"Browser launches during this run: {browser_pool.launches}")
+        page_load_policy.report()
+        connection_stats.report()
+        cache.report()
+        email_checker.save()
+        email_checker.report()
+        strategies.save()
+        strategies.report()
+        retry_policy.report()
+        text_preparer.report()
+        language_detector.save()
+        language_detector.report()
+        await llm_client.close()
+        llm_client.report()
+        # Fichiers JSON régénérés pour les outils qui les lisent encore
+        if export_websites is None:
+            store.export_table('results', results_file, store.results)
+        else:
+            store.export_table('results', results_file, lambda: store.results_for(export_websites))
+        store.record_json_sync(results_file)
+        store.export_json(tables=('failures', 'classified_links'))
+        store.close()
+
+# Résumé par affinages successifs : chaque morceau complète le résumé précédent, un appel LLM après l'autre
+async def refine_summary(chunks, language, addresses, names):
+    current_summary = ""
+    first_summary = True
+    for chunk in chunks:
+        print(f"Text sent to AI (part): {chunk}")
+        current_summary = await generate_summary(chunk, language, current_summary)
+        if check_for_info_tag(current_summary):
+            current_summary = current_summary.replace("@info@", "")
+            if first_summary:
+                company_name = await extract_company_name(current_summary)
+                first_summary = False    
+            await process_information(chunk, addresses, names, company_name)
+        print(f"Intermediate company summary: {current_summary}")
+    return current_summary
+
+# Résumé map-reduce : les morceaux sont résumés en parallèle, puis les résumés partiels sont fusionnés en arbre.
+# Le signal @info@ est lu sur chaque résumé partiel : les noms de personnes sont extraits des morceaux qui en contiennent,
+# pendant la fusion. Le débit reste limité par le client LLM partagé.
+async def map_reduce_summary(chunks, language, addresses, names):
+    if not chunks:
+        return ""
+    for chunk in chunks:
+        print(f"Text sent to AI (part): {chunk}")
+    partial_summaries = await asyncio.gather(*(generate_summary(chunk, language) for chunk in chunks))
+    info_chunks = [(chunk, summary) for chunk, summary in zip(chunks, partial_summaries) if check_for_info_tag(summary)]
+    partial_summaries = [summary.replace("@info@", "") for summary in partial_summaries]
+    for summary in partial_summaries:
+        print(f"Intermediate company summary: {summary}")
+
+    async def extract_personal_information():
+        if not info_chunks:
+            return
+        company_name = await extract_company_name(info_chunks[0][1].replace("@info@", ""))
+        await asyncio.gather(*(process_information(chunk, addresses, names, company_name) for chunk, _ in info_chunks))
+
+    summary, _ = await asyncio.gather(merge_summaries(partial_summaries, language), extract_personal_information())
+    return summary
+
+async def merge_summaries(summaries, language):
+    while len(summaries) > 1:
+        groups = [summaries[i:i + SUMMARY_MERGE_FANIN] for i in range(0, len(summaries), SUMMARY_MERGE_FANIN)]
+        summaries = await asyncio.gather(*(merge_summary_group(group, language) for group in groups))
+        for summary in summaries:
+            print(f"Intermediate company summary: {summary}")
+    return summaries[0]
+
+# Fusionner un groupe de résumés partiels : le premier sert de résumé courant, les autres de données à intégrer
+async def merge_summary_group(group, language):
+    if len(group) == 1:
+        return group[0]
+    merged = await generate_summary("\n\n".join(group[1:]), language, group[0])
+    return merged.replace("@info@", "")
+
+async def process_company(company, max_pages, browser_pool, session, results_lock, site_workers=SITE_WORKERS, throttle=None, cache=None, email_checker=None, strategies=None, summary_mode='map-reduce', store=None):
+    base_url = company["website"]
+
+    print(f"Crawling website: {base_url}")
+    emails, addresses, names, summary_texts = await crawl_website(base_url, max_pages, browser_pool, session, site_workers, throttle, cache, email_checker, strategies, store)
+
+    chunks = text_preparer.prepare(summary_texts)
+
+    language = detect_language(" ".join(chunks))
+
+    if summary_mode == 'refine':
+        current_summary = await refine_summary(chunks, language, addresses, names)
+    else:
+        current_summary = await map_reduce_summary(chunks, language, addresses, names)
+
+    company_name = await extract_company_name(current_summary)
+
+    print(f"Emails found: {emails}")
+    print(f"Addresses found: {addresses}")
+    print(f"Names found: {names}")
+    print(f"Company name: {company_name}")
+    print(f"Company summary: {current_summary}")
+
+    result = {
+        "company_name": company_name,
+        "summary": current_summary,
+        "language": language,
+        "mails": list(emails),
+        "addresses": list(addresses),
+        "personal_names": list(names),
+        "website": base_url
+    }
+    async with results_lock:
+        await asyncio.to_thread(update_company_data, result, store)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Crawl company websites to collect emails, addresses and summaries.")
+    parser.add_argument('company_info_file', nargs='?', default='Json_Files/company_info.json', help="Company list: JSON array, JSONL or CSV file")
+    parser.add_argument('max_pages', nargs='?', type=int, default=20)
+    parser.add_argument('--results-file', default='Json_Files/results.json')
+    parser.add_argument('--concurrency', type=int, default=1, help="Number of companies crawled at the same time")
+    parser.add_argument('--site-workers', type=int, default=SITE_WORKERS, help="Number of pages of the same site fetched at the same time")
+    parser.add_argument('--domain-delay', type=float, default=None, help=f"Minimum delay in seconds between two requests to the same domain (default: 0 with one site worker, {DOMAIN_MIN_DELAY} otherwise)")
+    parser.add_argument('--cache-max-age', type=float, default=CACHE_MAX_AGE / 3600, help="Hours during which a cached page is reused without revalidation")
+    parser.add_argument('--no-cache', action='store_true', help="Disable the on-disk page cache")
+    parser.add_argument('--offline-dns', action='store_true', help="Skip DNS deliverability lookups and only check email syntax")
+    parser.add_argument('--browser-pages', type=int, default=BROWSER_MAX_PAGES, help="Maximum number of pages open in the shared browser")
+    parser.add_argument('--readiness', choices=READINESS_STRATEGIES, default='mutations', help="When a browser page is considered rendered: DOM loaded and quiet for a short window, network idle, or load event")
+    parser.add_argument('--no-block-resources', action='store_true', help="Load images, fonts, media, stylesheets and trackers in the browser")
+    parser.add_argument('--llm-calls', type=int, default=LLM_MAX_CONCURRENT_CALLS, help="Maximum number of simultaneous LLM calls")
+    parser.add_argument('--summary-mode', choices=SUMMARY_MODES, default='map-reduce', help="Summarize page chunks concurrently and merge them in a tree, or refine one summary chunk after chunk")
+    parser.add_argument('--summary-tokens', type=int, default=SUMMARY_TOKEN_BUDGET, help="Maximum number of tokens of site text sent to the model for the summary")
+    parser.add_argument('--language-backend', choices=LANGUAGE_BACKENDS, default='auto', help="Language detector: langid when installed (faster), otherwise langdetect")
+    parser.add_argument('--no-llm-cache', action='store_true', help="Always send LLM requests instead of reusing cached responses")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_arguments()
+    llm_client.max_concurrent_calls = args.llm_calls
+    llm_client.cache.enabled = not args.no_llm_cache
+    text_preparer.token_budget = args.summary_tokens
+    language_detector = LanguageDetector(backend=args.language_backend)
+    if args.no_block_resources:
+        page_load_policy = PageLoadPolicy(blocked_resource_types=(), tracker_domains=(), readiness=args.readiness)
+    else:
+        page_load_policy = PageLoadPolicy(readiness=args.readiness)
+    asyncio.run(main(
+        args.company_info_file,
+        args.results_file,
+        args.max_pages,
+        max_browser_pages=args.browser_pages,
+        concurrency=args.concurrency,
+        site_workers=args.site_workers,
+        domain_delay=args.domain_delay,
+        cache=HttpCache(max_age=args.cache_max_age * 3600, enabled=not args.no_cache),
+        email_checker=DeliverabilityChecker(StubResolver()) if args.offline_dns else None,
+        summary_mode=args.summary_mode
+    ))
@@ -0,0 +1,109 @@
+import os
+import csv
+import json
+
+READ_CHUNK_SIZE = 64 * 1024  # Taille des blocs lus dans un fichier JSON (caractères)
+LIST_SEPARATOR = ';'  # Séparateur des valeurs multiples dans une cellule CSV
+LIST_FIELDS = ('mails', 'addresses', 'personal_names')  # Champs qui sont des listes dans les fichiers JSON
+
+# Éléments d'un tableau JSON lus un par un : seul l'élément en cours de décodage est gardé en mémoire.
+# Comme json.load, refuse une virgule manquante, en trop, en tête ou en fin de tableau, et tout ce qui suit
+# le crochet fermant hormis des espaces (ValueError).
+def iter_json_array(file, chunk_size=READ_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    # Attendu ensuite : '[' au début, puis un élément ou ']' (first), une virgule ou ']' (separator), un élément (element)
+    expected = 'start'
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = file.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        eof = not chunk
+
+    # Prochain caractère qui n'est pas un espace, None en fin de fichier
+    def next_char():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if eof:
+                return None
+            fill()
+
+    while True:
+        char = next_char()
+        if expected == 'start':
+            if char != '[':
+                raise ValueError("The JSON file must contain an array of companies")
+            position += 1
+            expected = 'first'
+            continue
+        if char is None:
+            raise ValueError("Unexpected end of JSON array")
+        if char == ']' and expected in ('first', 'separator'):
+            position += 1
+            if next_char() is not None:
+                raise ValueError(f"Unexpected data after the JSON array: {buffer[position:position + 20]!r}")
+            return
+        if expected == 'separator':
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' between array elements, found {char!r}")
+            position += 1
+            expected = 'element'
+            continue
+        if char in ',]':
+            raise ValueError(f"Expected an array element, found {char!r}")
+        # Un élément n'est accepté que s'il est suivi d'au moins un caractère : un nombre coupé en fin de bloc
+        # serait sinon décodé tronqué
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+            if end < len(buffer) or eof:
+                position = end
+                expected = 'separator'
+                yield element
+                continue
+        except json.JSONDecodeError:
+            if eof:
+                raise
+        fill()
+
+def iter_jsonl(file):
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding line {line_number}: {e}")
+
+# Lignes CSV : la première ligne donne les noms des champs, les listes sont séparées par des points-virgules
+def iter_csv(file):
+    for row in csv.DictReader(file):
+        company = {name.strip(): (value or '').strip() for name, value in row.items() if name}
+        for field in LIST_FIELDS:
+            if field in company:
+                company[field] = [value.strip() for value in company[field].split(LIST_SEPARATOR) if value.strip()]
+        yield company
+
+READERS = {
+    '.json': iter_json_array,
+    '.jsonl': iter_jsonl,
+    '.ndjson': iter_jsonl,
+    '.csv': iter_csv,
+}
+
+# Entreprises d'un fichier JSON (tableau), JSONL ou CSV, lues au fur et à mesure selon l'extension
+def iter_companies(path):
+    extension = os.path.splitext(path)[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise ValueError(f"Unsupported company list format: {extension or path}")
+    with open(path, 'r', encoding='utf-8', newline='' if extension == '.csv' else None) as file:
+        yield from reader(file)
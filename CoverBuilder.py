@@ -1,9 +1,10 @@
-import json
 import aiofiles
 import os
 import sys
-from groq import Groq
-from langdetect import detect
+from LLMClient import AsyncLLMClient
+from LLMCache import LLMCache
+from LanguageDetector import LanguageDetector
+from DataStore import DataStore
 import asyncio
 import shutil
 import re
@@ -23,16 +24,20 @@ async def load_api_key(file_path='groq_api_key.txt'):
 
 # Configuration de l'API Meta3
 api_key = asyncio.run(load_api_key())
-client = Groq(api_key=api_key.strip()) if api_key else None
+# Client partagé avec CompanyCraw : mêmes réglages et même cache de réponses sur disque
+llm_client = AsyncLLMClient(api_key.strip() if api_key else None, cache=LLMCache())
+# Détection de langue mémorisée, partagée avec CompanyCraw par son cache sur disque
+language_detector = LanguageDetector()
 
-# Fonction pour charger les données du fichier JSON
-async def load_results(json_file='Json_Files/results.json'):
+# Charger les résultats depuis la base : une seule entreprise est lue (par l'index) si son nom est donné
+async def load_results(store, company_name=None):
     try:
-        async with aiofiles.open(json_file, 'r', encoding='utf-8') as file:
-            data = await file.read()
-        return json.loads(data)
+        if company_name:
+            result = await asyncio.to_thread(store.result_named, company_name)
+            return [result] if result else []
+        return await asyncio.to_thread(store.results)
     except Exception as e:
-        print(f"Error loading results.json: {e}")
+        print(f"Error loading results: {e}")
         return []
 
 # Fonction pour charger les prompts à partir des fichiers
@@ -51,18 +56,9 @@ async def load_prompts():
         print(f"Error loading prompts: {e}")
         return "", "", "", ""
 
-# Fonction pour extraire le temps d'attente depuis le message d'erreur
-def extract_wait_time(error_message):
-    match = re.search(r'Please try again in (\d+\.?\d*)s', error_message)
-    if match:
-        return float(match.group(1))
-    match = re.search(r'Please try again in (\d+\.?\d*)m', error_message)
-    if match:
-        return float(match.group(1)) * 60
-    match = re.search(r'Please try again in (\d+\.?\d*)h', error_message)
-    if match:
-        return float(match.group(1)) * 3600
-    return None
+# Langue de l'entreprise : enregistrée par CompanyCraw avec les résultats, sinon détectée une fois sur le résumé
+def company_language(company_info):
+    return company_info.get("language") or language_detector.detect(company_info.get("summary", ""))
 
 def get_final_name(language_code, name):
     language_map = {
@@ -109,9 +105,8 @@ def replace_placeholders(prompt_text, company_info, profile_text=None,SelectedDe
     if profile_text != None:
         prompt_text = prompt_text.replace("{profile.txt}", profile_text)
 
-    # Detect language from the summary or default to English
-    summary = company_info.get("summary", "")
-    language_code = detect(summary) if summary else 'en'
+    # Language of the company (detected from the summary, English by default)
+    language_code = company_language(company_info)
     language_full = language_map.get(language_code, "English")
     prompt_text = prompt_text.replace("{language}", language_full)
     return prompt_text
@@ -124,7 +119,14 @@ def extract_text_from_response(response_text):
         return response_text[start+1:end]
     return ""
 
-async def generate_content(company_info, prompt,system_promp="", profile_text=None, is_valid_format=None,SelectedDest=None):
+# Réponse exploitable : un texte entre accolades, au format attendu le cas échéant
+def is_valid_response(response_text, is_valid_format=None):
+    extracted_text = extract_text_from_response(response_text)
+    return bool(extracted_text) and (is_valid_format is None or is_valid_format(extracted_text))
+
+# refresh_cache=True : ne pas réutiliser la réponse en cache (nouvel échantillon, qui remplace l'ancien).
+# Seules les réponses exploitables sont mises en cache.
+async def generate_content(company_info, prompt,system_promp="", profile_text=None, is_valid_format=None,SelectedDest=None, refresh_cache=False):
     base_prompt = replace_placeholders(prompt, company_info, profile_text,SelectedDest)
     messages = [
         {"role": "system", "content": system_promp},
@@ -133,11 +135,13 @@ async def generate_content(company_info, prompt,system_promp="", profile_text=No
 
     for attempt in range(RETRY_ATTEMPTS):
         try:
-            response = client.chat.completions.create(
-                messages=messages,
-                model="llama3-70b-8192"
+            # Après une réponse au format invalide, un nouvel échantillon remplace la réponse en cache
+            response_text = await llm_client.chat(
+                messages, refresh_cache=refresh_cache or attempt > 0,
+                validate=lambda reply: is_valid_response(reply, is_valid_format)
             )
-            response_text = response.choices[0].message.content
+            if response_text is None:
+                raise ValueError("No response from the LLM")
             extracted_text = extract_text_from_response(response_text)
             if extracted_text:
                 if is_valid_format is None or is_valid_format(extracted_text):
@@ -239,7 +243,7 @@ def set_subject(company_info, language_code):
     subject = subject_template.format(company_name=company_info.get("company_name", ""))
     return subject
 
-async def generate_files(company_info, recipient_manager):
+async def generate_files(company_info, recipient_manager, refresh_cache=False):
     print(f"generating files for {company_info['company_name']}...")
 
     recipient_system = "You are an expert building recipient addresses."
@@ -247,7 +251,7 @@ async def generate_files(company_info, recipient_manager):
 
     prompt_body, prompt_body_norecipient, promptrecipient, profile_text = await load_prompts()
 
-    destinataire_content = await generate_content(company_info, promptrecipient, recipient_system, profile_text, is_valid_format)
+    destinataire_content = await generate_content(company_info, promptrecipient, recipient_system, profile_text, is_valid_format, refresh_cache=refresh_cache)
     
     # Extrait la deuxième ligne du message
     lines = destinataire_content.split('\n')
@@ -258,10 +262,10 @@ async def generate_files(company_info, recipient_manager):
     
     # Check if NomDest contains any of the generic phrases (case-insensitive)
     if any(phrase.lower() in NomDest.lower() for phrase in generic_phrases):
-        corp_content = await generate_content(company_info, prompt_body_norecipient, body_system, profile_text, None, "")
+        corp_content = await generate_content(company_info, prompt_body_norecipient, body_system, profile_text, None, "", refresh_cache)
         NomDest = None  # Set to None if it's a generic recipient
     else:
-        corp_content = await generate_content(company_info, prompt_body, body_system, profile_text, None, NomDest)
+        corp_content = await generate_content(company_info, prompt_body, body_system, profile_text, None, NomDest, refresh_cache)
         # Extraire le destinataire de la première ligne non vide du contenu du corps
         lines = corp_content.split('\n')
         first_non_empty_line = next((line.strip() for line in lines if line.strip()), "")
@@ -272,9 +276,9 @@ async def generate_files(company_info, recipient_manager):
 
     # Update recipient info
     recipient_manager.update(company_info['company_name'], NomDest)
-    await recipient_manager.save()
     
-    language_code = detect(corp_content)
+    # La lettre est rédigée dans la langue de l'entreprise : inutile de la détecter à nouveau
+    language_code = company_language(company_info)
     sujet_content = set_subject(company_info, language_code)
     
     await save_to_file('Compilation/corp.txt', corp_content)
@@ -304,37 +308,34 @@ def is_valid_format(text):
     
     return True
 
+# Destinataires retenus par entreprise : chaque modification est écrite immédiatement dans la base
 class RecipientManager:
-    def __init__(self):
+    def __init__(self, store):
         self.recipients = {}
-        self.file_path = 'Json_Files/recipients.json'
+        self.store = store
 
     async def load(self):
         try:
-            async with aiofiles.open(self.file_path, 'r', encoding='utf-8') as file:
-                self.recipients = json.loads(await file.read())
-        except FileNotFoundError:
-            self.recipients = {}
-        except json.JSONDecodeError:
-            print(f"Error decoding {self.file_path}. Starting with an empty dictionary.")
+            self.recipients = await asyncio.to_thread(self.store.recipients)
+        except Exception as e:
+            print(f"Error loading recipients: {e}. Starting with an empty dictionary.")
             self.recipients = {}
 
-    async def save(self):
-        async with aiofiles.open(self.file_path, 'w', encoding='utf-8') as file:
-            await file.write(json.dumps(self.recipients, ensure_ascii=False, indent=4))
-
     def update(self, company_name: str, recipient: str):
         if recipient:
             self.recipients[company_name] = recipient
         elif company_name in self.recipients:
             del self.recipients[company_name]
+        self.store.set_recipient(company_name, recipient)
 
     def get(self, company_name: str) -> str:
         return self.recipients.get(company_name)
 
-async def build_covers(json_file='Json_Files/results.json', specific_company_name=None):
-    data = await load_results(json_file)
-    recipient_manager = RecipientManager()
+async def build_covers(store=None, specific_company_name=None):
+    own_store = store is None
+    store = store or DataStore()
+    data = await load_results(store, specific_company_name)
+    recipient_manager = RecipientManager(store)
     await recipient_manager.load()
 
     for company_info in data:
@@ -343,10 +344,11 @@ async def build_covers(json_file='Json_Files/results.json', specific_company_nam
             continue
         print(f"Traitement de {name}...")
         
-        name = get_final_name(detect(company_info.get("summary", "")), name)
+        name = get_final_name(company_language(company_info), name)
         
         for attempt in range(MAX_COMPILATION_ATTEMPTS):
-            await generate_files(company_info, recipient_manager)
+            # Les nouvelles tentatives demandent de nouveaux textes : l'échec de compilation peut venir du contenu généré
+            await generate_files(company_info, recipient_manager, refresh_cache=attempt > 0)
             print(f"Fichiers générés pour {name}.")   
             try:
                 await compile_latex(name)
@@ -358,8 +360,25 @@ async def build_covers(json_file='Json_Files/results.json', specific_company_nam
         else:
             print(f"Échec de la génération et de la compilation pour {name} après {MAX_COMPILATION_ATTEMPTS} tentatives.")
 
+    language_detector.save()
+    if own_store:
+        store.close()
+
+# Fermer le client LLM et afficher les statistiques, une seule fois à l'arrêt du programme appelant
+# (Mailsender appelle build_covers pour chaque entreprise)
+async def shutdown():
+    await llm_client.close()
+    llm_client.report()
+    language_detector.report()
+
+async def run(specific_company_name=None):
+    try:
+        await build_covers(specific_company_name=specific_company_name)
+    finally:
+        await shutdown()
+
 if __name__ == "__main__":
     specific_company_name = None
     if len(sys.argv) > 1:
         specific_company_name = sys.argv[1]
-    asyncio.run(build_covers(specific_company_name=specific_company_name))
\ No newline at end of file
+    asyncio.run(run(specific_company_name))
\ No newline at end of file
@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from CompanyReader import iter_companies
+from JsonFile import load_json, save_json
+
+DATA_STORE_PATH = 'Json_Files/scrapejobs.sqlite'
+
+# Fichiers JSON historiques, importés à la création de la base (sauf la liste d'entrée, enregistrée au fur et
+# à mesure par le crawler selon le fichier choisi) et régénérés par export_json
+JSON_PATHS = {
+    'companies': 'Json_Files/company_info.json',
+    'results': 'Json_Files/results.json',
+    'failures': 'Json_Files/failed_companies.json',
+    'recipients': 'Json_Files/recipients.json',
+    'drafts': 'Json_Files/drafts.json',
+    'classified_links': 'classified_links.json',
+}
+
+# Chemin du fichier JSON d'une table : emplacement historique, ou même nom de fichier dans json_dir
+def json_path(table, json_dir=None):
+    if json_dir is None:
+        return JSON_PATHS[table]
+    return os.path.join(json_dir, os.path.basename(JSON_PATHS[table]))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS companies (website TEXT PRIMARY KEY, company_name TEXT NOT NULL DEFAULT '', data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS companies_name ON companies (company_name);
+CREATE TABLE IF NOT EXISTS results (website TEXT PRIMARY KEY, company_name TEXT NOT NULL DEFAULT '', data TEXT NOT NULL, updated_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS results_name ON results (company_name);
+CREATE TABLE IF NOT EXISTS failures (website TEXT PRIMARY KEY, company_name TEXT NOT NULL DEFAULT '', failed_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS recipients (company_name TEXT PRIMARY KEY, recipient TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS drafts (draft_id TEXT PRIMARY KEY, company_name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS drafts_company ON drafts (company_name);
+CREATE TABLE IF NOT EXISTS classified_links (url TEXT PRIMARY KEY, category INTEGER NOT NULL);
+"""
+
+# Base SQLite (mode WAL) commune au crawler, au générateur de lettres et à l'envoi des e-mails : entreprises,
+# résultats, échecs, destinataires, brouillons et liens classés. Chaque modification est une transaction
+# sur une seule ligne, au lieu de relire et réécrire des fichiers JSON entiers. Les fichiers JSON existants
+# sont importés à la création de la base, et peuvent être régénérés par export_json.
+class DataStore:
+    # import_existing_json=False : la nouvelle base commence vide au lieu d'importer les fichiers JSON
+    def __init__(self, path=DATA_STORE_PATH, import_existing_json=True):
+        self.path = path
+        self.import_existing_json = import_existing_json
+        self._connection = None
+        # La connexion est partagée entre la boucle asyncio et les threads de asyncio.to_thread
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+            imported = self._connection.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+            if imported is None and self.import_existing_json:
+                self._import_json(None, companies=False)
+        return self._connection
+
+    def _write(self, statement, parameters=()):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(statement, parameters)
+
+    def _write_many(self, statement, rows):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(statement, rows)
+
+    def _read(self, statement, parameters=()):
+        with self._lock:
+            return self._connect().execute(statement, parameters).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    # Entreprises à traiter (liste d'entrée)
+    def import_companies(self, companies):
+        self._write_many(
+            "INSERT INTO companies (website, company_name, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(website) DO UPDATE SET company_name = excluded.company_name, data = excluded.data",
+            ((company.get('website', ''), company.get('company_name', ''), json.dumps(company, ensure_ascii=False)) for company in companies)
+        )
+
+    def company(self, website):
+        rows = self._read("SELECT data FROM companies WHERE website = ?", (website,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def companies(self):
+        return [json.loads(data) for data, in self._read("SELECT data FROM companies ORDER BY rowid")]
+
+    # Résultats : un enregistrement par site, remplacé en place lors d'un nouveau passage
+    def upsert_result(self, result):
+        self._write(
+            "INSERT INTO results (website, company_name, data, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(website) DO UPDATE SET company_name = excluded.company_name, data = excluded.data, updated_at = excluded.updated_at",
+            (result.get('website', ''), result.get('company_name', ''), json.dumps(result, ensure_ascii=False), time.time())
+        )
+
+    def result(self, website):
+        rows = self._read("SELECT data FROM results WHERE website = ?", (website,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def result_named(self, company_name):
+        rows = self._read("SELECT data FROM results WHERE company_name = ? ORDER BY rowid LIMIT 1", (company_name,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def has_result_named(self, company_name):
+        return bool(self._read("SELECT 1 FROM results WHERE company_name = ? LIMIT 1", (company_name,)))
+
+    def results(self):
+        return [json.loads(data) for data, in self._read("SELECT data FROM results ORDER BY rowid")]
+
+    # Résultats ajoutés après la ligne after_rowid : (rowid, résultat), pour ne relire que les nouveaux
+    def results_after(self, after_rowid):
+        return [(rowid, json.loads(data)) for rowid, data in self._read("SELECT rowid, data FROM results WHERE rowid > ? ORDER BY rowid", (after_rowid,))]
+
+    # Change à chaque transaction validée par une autre connexion (crawler, générateur de lettres), pas par celle-ci
+    def data_version(self):
+        return self._read("PRAGMA data_version")[0][0]
+
+    def add_failure(self, company_name, website):
+        self._write(
+            "INSERT INTO failures (website, company_name, failed_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(website) DO UPDATE SET company_name = excluded.company_name, failed_at = excluded.failed_at",
+            (website, company_name, time.time())
+        )
+
+    def failures(self):
+        return [{"company_name": company_name, "website": website}
+                for company_name, website in self._read("SELECT company_name, website FROM failures ORDER BY rowid")]
+
+    # Destinataire retenu pour chaque entreprise ; un destinataire vide supprime l'entrée
+    def set_recipient(self, company_name, recipient):
+        if recipient:
+            self._write("INSERT OR REPLACE INTO recipients (company_name, recipient) VALUES (?, ?)", (company_name, recipient))
+        else:
+            self._write("DELETE FROM recipients WHERE company_name = ?", (company_name,))
+
+    def recipient(self, company_name):
+        rows = self._read("SELECT recipient FROM recipients WHERE company_name = ?", (company_name,))
+        return rows[0][0] if rows else None
+
+    def recipients(self):
+        return dict(self._read("SELECT company_name, recipient FROM recipients ORDER BY rowid"))
+
+    # Brouillons Gmail : identifiant du brouillon -> entreprise
+    def add_draft(self, draft_id, company_name):
+        self._write("INSERT OR REPLACE INTO drafts (draft_id, company_name) VALUES (?, ?)", (draft_id, company_name))
+
+    def remove_draft(self, draft_id):
+        self._write("DELETE FROM drafts WHERE draft_id = ?", (draft_id,))
+
+    def drafts(self):
+        return dict(self._read("SELECT draft_id, company_name FROM drafts ORDER BY rowid"))
+
+    # Liens classés (catégorie 1 : contact/carrière, catégorie 2 : autres) ; un lien garde sa première catégorie
+    def add_classified_links(self, cat1_links, cat2_links):
+        rows = [(url, 1) for url in cat1_links] + [(url, 2) for url in cat2_links]
+        if rows:
+            self._write_many("INSERT OR IGNORE INTO classified_links (url, category) VALUES (?, ?)", rows)
+
+    def classified_links(self):
+        links = {"cat1_links": [], "cat2_links": []}
+        for url, category in self._read("SELECT url, category FROM classified_links ORDER BY rowid"):
+            links[f"cat{category}_links"].append(url)
+        return links
+
+    # companies=False : la liste d'entrée n'est pas importée
+    def _import_json(self, json_dir, companies=True):
+        def load(table):
+            return load_json(json_path(table, json_dir))
+
+        # La liste d'entrée peut être très longue : elle est lue au fur et à mesure
+        def load_companies():
+            try:
+                yield from iter_companies(json_path('companies', json_dir))
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                print(f"Error importing {json_path('companies', json_dir)}: {e}")
+
+        results = load('results')
+        failures = load('failures')
+        recipients = load('recipients')
+        drafts = load('drafts')
+        links = load('classified_links')
+        now = time.time()
+        connection = self._connection
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO companies (website, company_name, data) VALUES (?, ?, ?)",
+                ((company.get('website', ''), company.get('company_name', ''), json.dumps(company, ensure_ascii=False)) for company in (load_companies() if companies else ()))
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO results (website, company_name, data, updated_at) VALUES (?, ?, ?, ?)",
+                ((result.get('website', ''), result.get('company_name', ''), json.dumps(result, ensure_ascii=False), now) for result in results or [])
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO failures (website, company_name, failed_at) VALUES (?, ?, ?)",
+                ((failure.get('website', ''), failure.get('company_name', ''), now) for failure in failures or [])
+            )
+            connection.executemany("INSERT OR REPLACE INTO recipients (company_name, recipient) VALUES (?, ?)", (recipients or {}).items())
+            connection.executemany("INSERT OR REPLACE INTO drafts (draft_id, company_name) VALUES (?, ?)", (drafts or {}).items())
+            links = links or {}
+            connection.executemany(
+                "INSERT OR IGNORE INTO classified_links (url, category) VALUES (?, ?)",
+                [(url, 1) for url in links.get('cat1_links', [])] + [(url, 2) for url in links.get('cat2_links', [])]
+            )
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)", (str(now),))
+        self.record_json_sync(json_path('results', json_dir))
+
+    # Importer un fichier de résultats JSON : les résultats ajoutés ou modifiés dans le fichier remplacent ceux
+    # de la base (une entrée supprimée du fichier reste dans la base). Retourne les sites du fichier.
+    def import_results(self, file_path):
+        results = load_json(file_path, []) or []
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT INTO results (website, company_name, data, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(website) DO UPDATE SET company_name = excluded.company_name, data = excluded.data, updated_at = excluded.updated_at "
+                    "WHERE results.data != excluded.data",
+                    ((result.get('website', ''), result.get('company_name', ''), json.dumps(result, ensure_ascii=False), now) for result in results)
+                )
+            self.record_json_sync(file_path)
+        return [result.get('website', '') for result in results]
+
+    # Date de modification d'un fichier JSON lors de son dernier import ou export par la base
+    def record_json_sync(self, file_path):
+        try:
+            modified = os.path.getmtime(file_path)
+        except OSError:
+            return
+        self._write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"json_mtime:{os.path.abspath(file_path)}", repr(modified)))
+
+    # Le fichier a été modifié hors de la base (à la main, par un autre outil) depuis son dernier import ou export
+    def json_modified(self, file_path):
+        try:
+            modified = os.path.getmtime(file_path)
+        except OSError:
+            return False
+        rows = self._read("SELECT value FROM meta WHERE key = ?", (f"json_mtime:{os.path.abspath(file_path)}",))
+        return not rows or modified > float(rows[0][0])
+
+    # Résultats des sites donnés, dans l'ordre de la base
+    def results_for(self, websites):
+        websites = set(websites)
+        return [json.loads(data) for website, data in self._read("SELECT website, data FROM results ORDER BY rowid") if website in websites]
+
+    # Importer de nouveau les fichiers JSON (les entrées existantes de même clé sont remplacées)
+    def import_json(self, json_dir=None):
+        with self._lock:
+            self._connect()
+            self._import_json(json_dir)
+
+    # Régénérer les fichiers JSON historiques à partir de la base, pour les outils qui les lisent encore
+    def export_json(self, json_dir=None, tables=tuple(JSON_PATHS)):
+        exporters = {
+            'companies': self.companies,
+            'results': self.results,
+            'failures': self.failures,
+            'recipients': self.recipients,
+            'drafts': self.drafts,
+            'classified_links': self.classified_links,
+        }
+        for table in tables:
+            self.export_table(table, json_path(table, json_dir), exporters[table])
+            if table == 'results':
+                self.record_json_sync(json_path(table, json_dir))
+
+    @staticmethod
+    def export_table(table, file_path, exporter):
+        try:
+            data = exporter()
+        except Exception as e:
+            print(f"Error exporting {table}: {e}")
+            return
+        save_json(file_path, data, indent=4, description=file_path)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'export'
+    directory = sys.argv[2] if len(sys.argv) > 2 else None
+    store = DataStore()
+    if command == 'import':
+        store.import_json(directory)
+        print(f"JSON files imported into {store.path}")
+    elif command == 'export':
+        store.export_json(directory)
+        print(f"{store.path} exported to JSON files")
+    else:
+        print("Usage: python DataStore.py [import|export] [directory]")
+    store.close()
@@ -0,0 +1,111 @@
+import time
+import asyncio
+from email_validator import validate_email, EmailNotValidError
+from email_validator.deliverability import validate_email_deliverability
+from JsonFile import load_json, save_json
+
+MX_CACHE_PATH = 'Cache/mx_cache.json'
+POSITIVE_TTL = 7 * 24 * 3600  # Durée de validité d'un domaine qui accepte les e-mails (secondes)
+NEGATIVE_TTL = 24 * 3600  # Durée de validité d'un domaine qui n'accepte pas les e-mails (secondes)
+DNS_TIMEOUT = 15
+
+# Résolution réelle : mêmes règles que validate_email(check_deliverability=True) (MX, repli A/AAAA, MX nul, SPF),
+# exécutée dans un thread pour ne pas bloquer la boucle asyncio
+class DnsResolver:
+    persistent = True
+
+    def __init__(self, timeout=DNS_TIMEOUT):
+        self.timeout = timeout
+
+    # Retourne (délivrable, erreur, résultat définitif)
+    async def check(self, domain, domain_i18n):
+        try:
+            info = await asyncio.to_thread(validate_email_deliverability, domain, domain_i18n, self.timeout)
+        except EmailNotValidError as e:
+            return False, str(e), True
+        # Délai dépassé ou serveur DNS indisponible : l'adresse est acceptée mais le résultat n'est pas mémorisé
+        return True, None, 'unknown-deliverability' not in info
+
+# Résolveur factice sans accès réseau, pour les tests et les exécutions hors ligne
+class StubResolver:
+    persistent = False
+
+    def __init__(self, records=None, default=True):
+        self.records = {domain.lower(): deliverable for domain, deliverable in (records or {}).items()}
+        self.default = default
+
+    async def check(self, domain, domain_i18n):
+        deliverable = self.records.get(domain.lower(), self.default)
+        error = None if deliverable else f"The domain name {domain_i18n} does not accept email (stub resolver)."
+        return deliverable, error, True
+
+# Validation des e-mails : la syntaxe est vérifiée localement, la délivrabilité une seule fois par domaine.
+# Les résultats positifs et négatifs sont mémorisés avec une durée de vie, entre entreprises et entre exécutions.
+class DeliverabilityChecker:
+    def __init__(self, resolver=None, cache_path=MX_CACHE_PATH, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.resolver = resolver or DnsResolver()
+        self.cache_path = cache_path if self.resolver.persistent else None
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.lookups = 0
+        self.cache_hits = 0
+        self._pending = {}
+        self.cache = self._load()
+
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        return load_json(self.cache_path, {}, "MX cache")
+
+    def save(self):
+        if not self.cache_path:
+            return
+        save_json(self.cache_path, self.cache, indent=4, description="MX cache")
+
+    def _cached(self, domain):
+        entry = self.cache.get(domain)
+        if not entry:
+            return None
+        ttl = self.positive_ttl if entry['deliverable'] else self.negative_ttl
+        return entry if time.time() - entry['checked_at'] < ttl else None
+
+    async def _lookup(self, domain, domain_i18n):
+        self.lookups += 1
+        deliverable, error, definitive = await self.resolver.check(domain, domain_i18n)
+        if definitive:
+            self.cache[domain] = {"deliverable": deliverable, "error": error, "checked_at": time.time()}
+        return deliverable, error
+
+    async def check_domain(self, domain, domain_i18n=None):
+        entry = self._cached(domain)
+        if entry:
+            self.cache_hits += 1
+            return entry['deliverable'], entry['error']
+        # Une seule résolution par domaine, même si plusieurs adresses sont validées en même temps
+        task = self._pending.get(domain)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup(domain, domain_i18n or domain))
+            self._pending[domain] = task
+            task.add_done_callback(lambda _: self._pending.pop(domain, None))
+        return await asyncio.shield(task)
+
+    # Retourne l'adresse normalisée, ou None si elle est invalide ou non délivrable
+    async def validate(self, email):
+        try:
+            email_info = validate_email(email, check_deliverability=False)
+        except EmailNotValidError as e:
+            print(f"Invalid email '{email}': {str(e)}")
+            return None
+        deliverable, error = await self.check_domain(email_info.ascii_domain, email_info.domain)
+        if not deliverable:
+            print(f"Invalid email '{email}': {error}")
+            return None
+        return email_info.normalized
+
+    # Valider une liste d'adresses en parallèle, en conservant leur ordre
+    async def validate_all(self, emails):
+        results = await asyncio.gather(*(self.validate(email) for email in emails))
+        return [email for email in results if email]
+
+    def report(self):
+        print(f"Email deliverability: {self.lookups} DNS lookups, {self.cache_hits} answered from cache")
@@ -0,0 +1,214 @@
+import re
+import html
+import base64
+import binascii
+from urllib.parse import unquote
+
+CONTEXT_RADIUS = 500  # Nombre de caractères conservés de chaque côté d'un e-mail trouvé
+
+# Variantes de @ et de . : symbole (avec ou sans espaces de chaque côté), formes obfusquées ([at], (dot), " at "...)
+# et entités HTML restées dans le texte. Les formes ambiguës (" at " seul, point entouré d'espaces) ne sont
+# retenues que si l'autre séparateur les confirme : voir accepted_separators.
+AT_PATTERN = r'(?:[ \t]*@[ \t]*|\s*[\[\(\{]\s*(?i:at)\s*[\]\)\}]\s*|\s+(?:at|AT)\s+|[ \t]*(?:&#0*64;|(?i:&#x0*40;)|&commat;)[ \t]*)'
+DOT_PATTERN = r'(?:[ \t]+\.[ \t]*(?=[a-z0-9])|\.[ \t]+(?=[a-z0-9])|\.|\s*[\[\(\{]\s*(?i:dot)\s*[\]\)\}]\s*|\s+(?:dot|DOT)\s+|[ \t]*(?:&#0*46;|(?i:&#x0*2e;)|&period;)[ \t]*)'
+
+# Le lookbehind n'autorise un début de correspondance qu'au début d'un mot : chaque mot n'est examiné
+# qu'une fois, le balayage reste linéaire même sur de longues chaînes sans e-mail
+EMAIL_PATTERN = re.compile(
+    rf'(?<![a-zA-Z0-9._%+-])(?P<local>[a-zA-Z0-9._%+-]+)(?P<at>{AT_PATTERN})'
+    rf'(?P<domain>[a-zA-Z0-9-]+(?:{DOT_PATTERN}[a-zA-Z0-9-]+)*{DOT_PATTERN}[a-zA-Z]{{2,}})'
+)
+DOT_SEPARATOR = re.compile(DOT_PATTERN)
+TLD_PATTERN = re.compile(r'[a-zA-Z]{2,}')
+LOWERCASE_TLD_PATTERN = re.compile(r'[a-z]{2,}')
+
+# Points d'ancrage possibles d'un e-mail : seules ces positions déclenchent l'analyse complète
+AT_ANCHOR = re.compile(r'@|(?i:\bat\b)|&#0*64;|(?i:&#x0*40;)|&commat;')
+LOCAL_PART_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-')
+SEPARATOR_CHARS = frozenset(' \t\r\n[({')
+
+# Jetons base64 d'au moins 8 caractères (un e-mail encodé en fait au moins autant)
+BASE64_TOKEN = re.compile(r'(?<![A-Za-z0-9+/=])(?:[A-Za-z0-9+/]{4}){2,}(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?(?![A-Za-z0-9+/=])')
+
+# Cible d'un lien mailto dans un attribut (href, onclick...) : les adresses multiples sont séparées par des virgules
+MAILTO_TARGET = re.compile(r'mailto:([^\'"\s<>?#)]+)', re.IGNORECASE)
+
+# Fragments de JavaScript en ligne utilisés pour masquer une adresse : chaînes concaténées
+# ('info' + '@' + domain), chaînes inversées et String.fromCharCode(...)
+JS_STRING_LITERAL = r"""(?:'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")"""
+JS_IDENTIFIER = r'[A-Za-z_$][\w$]*'
+JS_CONCATENATION = re.compile(rf'(?:{JS_STRING_LITERAL}|{JS_IDENTIFIER})(?:\s*\+\s*(?:{JS_STRING_LITERAL}|{JS_IDENTIFIER}))+')
+JS_OPERAND = re.compile(rf'{JS_STRING_LITERAL}|{JS_IDENTIFIER}')
+JS_ASSIGNMENT = re.compile(rf'({JS_IDENTIFIER})\s*=\s*({JS_STRING_LITERAL})\s*[;,\n]')
+JS_REVERSED = re.compile(rf'({JS_STRING_LITERAL})\s*\.split\(\s*(?:""|\'\')\s*\)\s*\.reverse\(\s*\)\s*\.join\(\s*(?:""|\'\')\s*\)')
+JS_CHAR_CODES = re.compile(r'String\.fromCharCode\(\s*(\d+(?:\s*,\s*\d+)*)\s*\)')
+JS_ESCAPE = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|.)', re.DOTALL)
+JS_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+# Un script sans aucun de ces indices ne peut pas produire d'adresse : il n'est pas analysé
+SCRIPT_HINTS = ('@', 'mailto', '\\x40', '\\u0040', '&#64;', 'fromCharCode', 'reverse')
+
+# Forme d'un séparateur : 'plain' (@ ou . seul), 'spaced' (entouré d'espaces), 'word' (at, dot) ou 'obfuscated'
+# ([at], (dot), entités HTML)
+def separator_kind(separator):
+    stripped = separator.strip()
+    if stripped in ('@', '.'):
+        return 'plain' if stripped == separator else 'spaced'
+    if stripped.lower() in ('at', 'dot'):
+        return 'word'
+    return 'obfuscated'
+
+# Une phrase ordinaire (« team at Google. we ») ressemble à une adresse obfusquée : un " at " seul exige des
+# points obfusqués, un point entouré d'espaces exige un @ collé ou obfusqué et aucun point ordinaire, et
+# l'extension d'une adresse qui n'est pas écrite normalement doit être en minuscules.
+def accepted_separators(at, dots, tld):
+    at_kind = separator_kind(at)
+    dot_kinds = [separator_kind(dot) for dot in dots]
+    if not TLD_PATTERN.fullmatch(tld):
+        return False
+    if at_kind == 'word' and any(kind in ('plain', 'spaced') for kind in dot_kinds):
+        return False
+    if 'spaced' in dot_kinds and (at_kind not in ('plain', 'obfuscated') or 'plain' in dot_kinds):
+        return False
+    if (at_kind != 'plain' or any(kind != 'plain' for kind in dot_kinds)) and not LOWERCASE_TLD_PATTERN.fullmatch(tld):
+        return False
+    return True
+
+# Adresse normalisée et position de fin d'une correspondance, ou None si aucune adresse n'est acceptable.
+# Le domaine est raccourci label par label : « jobs@example.com. we » donne jobs@example.com.
+def email_from_match(match):
+    domain = match.group('domain')
+    labels = DOT_SEPARATOR.split(domain)
+    dots = list(DOT_SEPARATOR.finditer(domain))
+    for count in range(len(labels), 1, -1):
+        if accepted_separators(match.group('at'), [dot.group() for dot in dots[:count - 1]], labels[count - 1]):
+            end = match.start('domain') + dots[count - 2].end() + len(labels[count - 1])
+            return f"{match.group('local')}@{'.'.join(labels[:count])}", end
+    return None
+
+def decode_base64_token(token):
+    try:
+        decoded = base64.b64decode(token, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    if b'@' not in decoded:
+        return None
+    try:
+        return decoded.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+# Décoder une adresse protégée par Cloudflare (attribut data-cfemail ou lien /cdn-cgi/l/email-protection#...)
+def decode_cfemail(encoded):
+    try:
+        data = bytes.fromhex(encoded)
+    except ValueError:
+        return None
+    if len(data) < 2:
+        return None
+    key = data[0]
+    try:
+        decoded = bytes(byte ^ key for byte in data[1:]).decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return decoded if '@' in decoded else None
+
+# Adresses des cibles mailto trouvées dans une valeur d'attribut, entités HTML et encodage URL décodés
+def mailto_targets(value):
+    emails = []
+    for match in MAILTO_TARGET.finditer(html.unescape(value)):
+        for email in unquote(match.group(1)).split(','):
+            email = email.strip()
+            if email and email not in emails:
+                emails.append(email)
+    return emails
+
+def decode_js_escape(match):
+    escape = match.group(1)
+    if escape[0] in 'xu' and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    return JS_SIMPLE_ESCAPES.get(escape, escape)
+
+def decode_js_string(literal):
+    return JS_ESCAPE.sub(decode_js_escape, literal[1:-1])
+
+# Chaînes reconstituées à partir d'un script : seules les formes d'obfuscation sont retenues,
+# une adresse écrite telle quelle dans une chaîne (configuration, DSN...) n'est pas un lien mailto
+def script_strings(script):
+    variables = {name: decode_js_string(literal) for name, literal in JS_ASSIGNMENT.findall(script)}
+    for match in JS_REVERSED.finditer(script):
+        yield decode_js_string(match.group(1))[::-1]
+    for match in JS_CHAR_CODES.finditer(script):
+        yield ''.join(chr(int(code)) for code in match.group(1).split(','))
+    for match in JS_CONCATENATION.finditer(script):
+        parts = []
+        for operand in JS_OPERAND.findall(match.group()):
+            if operand[0] in '\'"':
+                parts.append(decode_js_string(operand))
+            else:
+                # Variable inconnue : remplacée par un séparateur pour ne pas coller les morceaux voisins
+                parts.append(variables.get(operand, ' '))
+        yield ''.join(parts)
+    for literal in variables.values():
+        if 'mailto:' in literal.lower():
+            yield literal
+
+# Adresses générées par un script en ligne ou un attribut onclick, sans l'exécuter
+def script_emails(script):
+    emails = []
+    if not any(hint in script for hint in SCRIPT_HINTS):
+        return emails
+    for value in script_strings(script):
+        if '@' not in value and '&' not in value and '%40' not in value:
+            continue
+        value = unquote(html.unescape(value))
+        for email, _, _ in scan_emails(value):
+            if email not in emails:
+                emails.append(email)
+    return emails
+
+# Parcourir le texte une seule fois et produire (email, début, fin) avec les positions dans le texte d'origine.
+# Les jetons base64 contenant un e-mail sont décodés ; la position retournée est alors celle du jeton.
+def scan_emails(text):
+    resume = 0
+    for anchor in AT_ANCHOR.finditer(text):
+        if anchor.start() < resume:
+            continue
+        # Reculer sur les séparateurs de l'obfuscation puis sur la partie locale de l'adresse
+        local_end = anchor.start()
+        while local_end > resume and text[local_end - 1] in SEPARATOR_CHARS:
+            local_end -= 1
+        start = local_end
+        while start > resume and text[start - 1] in LOCAL_PART_CHARS:
+            start -= 1
+        if start == local_end:
+            continue
+        match = EMAIL_PATTERN.match(text, start)
+        found = email_from_match(match) if match else None
+        if found:
+            email, end = found
+            resume = end
+            yield email, match.start(), end
+    for token in BASE64_TOKEN.finditer(text):
+        # Un mot ordinaire en minuscules n'est pas un e-mail encodé : inutile de le décoder
+        if token.group()[1:].islower():
+            continue
+        decoded = decode_base64_token(token.group())
+        if decoded:
+            for match in EMAIL_PATTERN.finditer(decoded):
+                found = email_from_match(match)
+                if found:
+                    yield found[0], token.start(), token.end()
+
+# Fusionner les fenêtres de contexte qui se chevauchent : plusieurs e-mails proches (page de contact,
+# pied de page) partagent une seule fenêtre. spans : [(email, début, fin)] dans l'ordre du texte.
+# Retourne [(début, fin, [emails])].
+def merge_context_windows(spans, text_length, radius=CONTEXT_RADIUS):
+    windows = []
+    for email, start, end in sorted(spans, key=lambda span: span[1]):
+        window_start, window_end = max(start - radius, 0), min(end + radius, text_length)
+        if windows and window_start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], window_end)
+            windows[-1][2].append(email)
+        else:
+            windows.append([window_start, window_end, [email]])
+    return [tuple(window) for window in windows]
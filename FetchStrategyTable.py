@@ -0,0 +1,99 @@
+import time
+from urllib.parse import urlparse
+from UrlCanonicalizer import canonicalize_url
+from JsonFile import load_json, save_json
+
+STRATEGY_PATH = 'Cache/fetch_strategies.json'
+STRATEGY_TTL = 14 * 24 * 3600  # Durée après laquelle la méthode d'un domaine est de nouveau testée (secondes)
+FETCH_METHODS = ('aiohttp', 'playwright')
+MISSING_PAGE_STATUSES = frozenset({404, 410})  # La page n'existe pas : ce n'est pas un blocage du domaine
+
+# Méthode de récupération qui fonctionne pour chaque domaine (aiohttp ou Playwright), codes HTTP observés
+# et besoin de JavaScript pour faire apparaître les liens. La table est conservée entre les exécutions.
+class FetchStrategyTable:
+    def __init__(self, path=STRATEGY_PATH, ttl=STRATEGY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.direct_fetches = 0
+        self.learned = 0
+        self.domains = self._load()
+
+    def _load(self):
+        if not self.path:
+            return {}
+        return load_json(self.path, {}, "fetch strategies")
+
+    def save(self):
+        if not self.path:
+            return
+        save_json(self.path, self.domains, indent=4, description="fetch strategies")
+
+    @staticmethod
+    def domain(url):
+        return (urlparse(canonicalize_url(url)).hostname or url).lower()
+
+    def _entry(self, url):
+        return self.domains.setdefault(self.domain(url), {"method": None, "js_needed": False, "statuses": {}, "last_status": None, "updated_at": 0})
+
+    def _current(self, url):
+        entry = self.domains.get(self.domain(url))
+        if entry and time.time() - entry['updated_at'] < self.ttl:
+            return entry
+        return None
+
+    # Méthode à utiliser directement pour ce domaine, ou None si elle n'est pas (ou plus) connue
+    def preferred_method(self, url):
+        entry = self._current(url)
+        if not entry:
+            return None
+        return 'playwright' if entry['js_needed'] else entry['method']
+
+    def needs_js(self, url):
+        entry = self._current(url)
+        return bool(entry and entry['js_needed'])
+
+    # À appeler quand la récupération est envoyée directement à la méthode mémorisée
+    def use_preferred(self):
+        self.direct_fetches += 1
+
+    def record_status(self, url, status):
+        entry = self._entry(url)
+        entry['statuses'][str(status)] = entry['statuses'].get(str(status), 0) + 1
+        entry['last_status'] = status
+
+    # aiohttp a échoué puis Playwright a réussi : le domaine bloque aiohttp, sauf si la page n'existe simplement pas
+    def record_fallback(self, url):
+        entry = self._entry(url)
+        if entry.get('last_status') not in MISSING_PAGE_STATUSES:
+            self.record_success(url, 'playwright')
+
+    # La date n'est mise à jour que lorsque la stratégie change ou a expiré, pour que chaque domaine soit
+    # de nouveau testé après self.ttl même s'il est visité régulièrement
+    def record_success(self, url, method):
+        entry = self._entry(url)
+        expired = self._current(url) is None
+        if entry['method'] == method and not expired:
+            return
+        if entry['method'] != method:
+            self.learned += 1
+        if expired:
+            entry['js_needed'] = False
+        entry['method'] = method
+        entry['updated_at'] = time.time()
+
+    # Les liens du site n'apparaissent qu'après exécution du JavaScript
+    def mark_js_needed(self, url):
+        entry = self._entry(url)
+        if self.needs_js(url):
+            return
+        self.learned += 1
+        entry['js_needed'] = True
+        entry['method'] = 'playwright'
+        entry['updated_at'] = time.time()
+
+    def report(self):
+        known = [entry for entry in self.domains.values() if entry['method']]
+        by_method = {method: sum(1 for entry in known if entry['method'] == method) for method in FETCH_METHODS}
+        js_needed = sum(1 for entry in known if entry['js_needed'])
+        print(f"Fetch strategies: {len(known)} domains known ({by_method['aiohttp']} aiohttp, {by_method['playwright']} Playwright, "
+              f"{js_needed} needing JavaScript), {self.learned} learned this run, {self.direct_fetches} fetches sent straight to Playwright")
@@ -0,0 +1,82 @@
+import os
+import time
+import hashlib
+from UrlCanonicalizer import canonicalize_url, url_key
+from JsonFile import load_json, save_json
+
+CACHE_DIR = 'Cache/http'
+CACHE_MAX_AGE = 24 * 3600  # Durée pendant laquelle une page est servie sans revalidation (secondes)
+
+# Cache disque des pages récupérées, indexé par URL canonique.
+# Chaque entrée conserve le corps, les en-têtes, l'ETag, Last-Modified et la méthode de récupération.
+class HttpCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_age=CACHE_MAX_AGE, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    def _path(self, url):
+        digest = hashlib.sha256(url_key(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json")
+
+    def get(self, url):
+        if not self.enabled:
+            return None
+        return load_json(self._path(url), description=f"cache entry for {url}")
+
+    def _write(self, url, entry):
+        save_json(self._path(url), entry, description=f"cache entry for {url}")
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get('fetched_at', 0) < self.max_age
+
+    # En-têtes de requête conditionnelle (If-None-Match / If-Modified-Since) pour une entrée
+    def validation_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    # Page servie directement depuis le cache, sans requête réseau
+    def hit(self, entry):
+        self.hits += 1
+        self.bytes_saved += len(entry['body'].encode('utf-8'))
+        return entry['body']
+
+    # Le serveur a répondu 304 : le corps en cache est toujours valable
+    def refresh(self, url, entry):
+        self.revalidated += 1
+        self.bytes_saved += len(entry['body'].encode('utf-8'))
+        entry['fetched_at'] = time.time()
+        self._write(url, entry)
+        return entry['body']
+
+    def store(self, url, body, method, headers=None):
+        self.bytes_downloaded += len(body.encode('utf-8'))
+        if not self.enabled:
+            return
+        self.misses += 1
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        entry = {
+            "url": canonicalize_url(url),
+            "method": method,
+            "fetched_at": time.time(),
+            "etag": headers.get('etag'),
+            "last_modified": headers.get('last-modified'),
+            "headers": headers,
+            "body": body
+        }
+        self._write(url, entry)
+
+    def report(self):
+        total = self.bytes_downloaded + self.bytes_saved
+        saved_ratio = self.bytes_saved / total if total else 0.0
+        print(f"HTTP cache: {self.hits} fresh hits, {self.revalidated} revalidated (304), {self.misses} downloaded; "
+              f"{self.bytes_downloaded / 1e6:.1f} MB downloaded, {self.bytes_saved / 1e6:.1f} MB served from cache ({saved_ratio:.0%})")
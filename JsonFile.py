@@ -0,0 +1,27 @@
+import os
+import json
+
+# Lecture et écriture des fichiers JSON du projet (caches, tables apprises, exports de la base).
+# description : nom affiché dans les messages d'erreur (le chemin du fichier par défaut).
+
+# Contenu d'un fichier JSON, ou default s'il n'existe pas ou est illisible
+def load_json(path, default=None, description=None):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"Error loading {description or path}: {e}")
+        return default
+
+# Écriture atomique : le fichier est écrit à côté puis renommé, un lecteur ne voit jamais un fichier à moitié écrit
+def save_json(path, data, indent=None, description=None):
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, indent=indent)
+        os.replace(temp_path, path)
+    except Exception as e:
+        print(f"Error saving {description or path}: {e}")
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+LLM_CACHE_PATH = 'Cache/llm_cache.sqlite'
+
+# Cache disque des réponses LLM, adressé par le contenu de la requête : la clé est l'empreinte SHA-256
+# du modèle, des messages et des paramètres. Une même requête n'est envoyée qu'une fois, entre exécutions
+# et entre CompanyCraw et CoverBuilder.
+class LLMCache:
+    def __init__(self, path=LLM_CACHE_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._connection = None
+
+    @staticmethod
+    def key(model, messages, params=None):
+        payload = json.dumps({"model": model, "messages": messages, "params": params or {}}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+        return self._connection
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            row = self._connect().execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading LLM cache: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def store(self, key, model, response):
+        if not self.enabled:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                    (key, model, response, time.time())
+                )
+            self.stores += 1
+        except sqlite3.Error as e:
+            print(f"Error writing LLM cache: {e}")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def report(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        print(f"LLM cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0%} hit rate), {self.stores} responses stored")
@@ -0,0 +1,138 @@
+import re
+import time
+import random
+import asyncio
+from groq import AsyncGroq, APIStatusError, AuthenticationError, BadRequestError, NotFoundError, PermissionDeniedError
+
+DEFAULT_MODEL = "llama3-70b-8192"
+LLM_RETRY_ATTEMPTS = 5
+LLM_MAX_CONCURRENT_CALLS = 2  # Nombre maximum d'appels simultanés à l'API Groq
+LLM_BACKOFF_BASE = 3.0  # Délai de la première nouvelle tentative hors limite de débit, doublé à chaque échec (secondes)
+LLM_BACKOFF_MAX = 60.0  # Délai maximum entre deux tentatives hors limite de débit (secondes)
+
+# Erreurs qui se reproduiront à l'identique : inutile de réessayer
+FATAL_ERRORS = (AuthenticationError, BadRequestError, NotFoundError, PermissionDeniedError)
+
+# Fonction pour extraire le temps d'attente depuis le message d'erreur
+def extract_wait_time(error_message):
+    match = re.search(r'Please try again in (\d+\.?\d*)s', error_message)
+    if match:
+        return float(match.group(1))
+    match = re.search(r'Please try again in (\d+\.?\d*)m', error_message)
+    if match:
+        return float(match.group(1)) * 60
+    match = re.search(r'Please try again in (\d+\.?\d*)h', error_message)
+    if match:
+        return float(match.group(1)) * 3600
+    return None
+
+def retry_after_header(error):
+    if not isinstance(error, APIStatusError):
+        return None
+    try:
+        return float(error.response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+# Client Groq asynchrone : les appels et les attentes ne bloquent pas la boucle asyncio.
+# Quand la limite de débit est atteinte, tous les appels attendent la même date de reprise au lieu
+# de relancer chacun leur requête ; les autres erreurs passagères sont réessayées avec un délai exponentiel.
+# Les réponses sont conservées dans le cache LLM (LLMCache) quand il est fourni.
+class AsyncLLMClient:
+    def __init__(self, api_key, model=DEFAULT_MODEL, max_concurrent_calls=LLM_MAX_CONCURRENT_CALLS, attempts=LLM_RETRY_ATTEMPTS,
+                 base_delay=LLM_BACKOFF_BASE, max_delay=LLM_BACKOFF_MAX, cache=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.model = model
+        self.max_concurrent_calls = max_concurrent_calls
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.rate_limit_hits = 0
+        self.tokens = 0
+        self.rate_limit_wait = 0.0
+        self._client = None
+        self._semaphore = None
+        self._resume_at = 0.0
+
+    # Le client et le sémaphore sont créés dans la boucle qui les utilise
+    def _ensure_client(self):
+        if self._client is None:
+            self._client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+
+    async def _wait_for_rate_limit(self):
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self.cache is not None:
+            self.cache.close()
+
+    # Retourne le contenu de la réponse, ou None si l'appel a échoué après toutes les tentatives.
+    # use_cache=False : ni lecture ni écriture dans le cache (échantillonnage toujours nouveau) ;
+    # refresh_cache=True : la réponse en cache est ignorée et remplacée par une nouvelle réponse ;
+    # validate : une réponse n'est mise en cache (et une réponse en cache réutilisée) que si validate(réponse) est vrai.
+    async def chat(self, messages, model=None, use_cache=True, refresh_cache=False, validate=None, **params):
+        model = model or self.model
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.key(model, messages, params)
+            if not refresh_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None and (validate is None or validate(cached)):
+                    return cached
+        response = await self._request(messages, model, **params)
+        if cache_key and response is not None and (validate is None or validate(response)):
+            self.cache.store(cache_key, model, response)
+        return response
+
+    async def _request(self, messages, model, **params):
+        if not self.api_key:
+            print("Error: no Groq API key available, LLM call skipped")
+            return None
+        self._ensure_client()
+        for attempt in range(self.attempts):
+            await self._wait_for_rate_limit()
+            try:
+                async with self._semaphore:
+                    self.calls += 1
+                    chat_completion = await self._client.chat.completions.create(messages=messages, model=model, **params)
+                usage = getattr(chat_completion, 'usage', None)
+                if usage is not None:
+                    self.tokens += usage.total_tokens or 0
+                return chat_completion.choices[0].message.content or ""
+            except FATAL_ERRORS as e:
+                print(f"Error: {e}")
+                break
+            except Exception as e:
+                print(f"Error: {e}")
+                if attempt == self.attempts - 1:
+                    break
+                self.retries += 1
+                wait_time = extract_wait_time(str(e)) or retry_after_header(e)
+                if wait_time:
+                    print(f"Rate limit exceeded. Waiting for {wait_time} seconds before retrying...")
+                    self.rate_limit_hits += 1
+                    self.rate_limit_wait += wait_time
+                    self._resume_at = max(self._resume_at, time.monotonic() + wait_time)
+                else:
+                    await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+        self.failures += 1
+        return None
+
+    def report(self):
+        print(f"LLM calls: {self.calls} requests ({self.tokens} tokens), {self.retries} retries, {self.failures} failed, "
+              f"{self.rate_limit_hits} rate limits ({self.rate_limit_wait:.1f} s of waiting, shared by concurrent calls)")
+        if self.cache is not None:
+            self.cache.report()
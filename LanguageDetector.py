@@ -0,0 +1,82 @@
+import hashlib
+from langdetect import DetectorFactory, detect, LangDetectException
+from JsonFile import load_json, save_json
+
+# Détecteur plus rapide, utilisé s'il est installé
+try:
+    import langid
+except ImportError:
+    langid = None
+
+LANGUAGE_CACHE_PATH = 'Cache/languages.json'
+LANGUAGE_BACKENDS = ('auto', 'langid', 'langdetect')
+DEFAULT_LANGUAGE = 'en'
+DETECTION_MAX_CHARS = 2000  # Seul le début du texte est analysé : la langue y est déjà sans ambiguïté
+
+# Graine fixe : sans elle, langdetect peut donner une langue différente à chaque appel sur le même texte
+DetectorFactory.seed = 0
+
+def detect_with_langdetect(text):
+    return detect(text)
+
+def detect_with_langid(text):
+    return langid.classify(text)[0]
+
+# Service de détection de langue partagé par le crawler et le générateur de lettres : chaque texte n'est
+# analysé qu'une fois, le résultat est mémorisé par empreinte du contenu et conservé entre les exécutions.
+class LanguageDetector:
+    def __init__(self, backend='auto', cache_path=LANGUAGE_CACHE_PATH, default=DEFAULT_LANGUAGE, max_chars=DETECTION_MAX_CHARS):
+        if backend not in LANGUAGE_BACKENDS:
+            raise ValueError(f"Unknown language detection backend: {backend}")
+        if backend == 'langid' and langid is None:
+            raise ValueError("The langid backend requires the langid package")
+        if backend == 'auto':
+            backend = 'langid' if langid is not None else 'langdetect'
+        self.backend = backend
+        self._detect = detect_with_langid if backend == 'langid' else detect_with_langdetect
+        self.cache_path = cache_path
+        self.default = default
+        self.max_chars = max_chars
+        self.detections = 0
+        self.cache_hits = 0
+        self.cache = self._load()
+
+    def _load(self):
+        if not self.cache_path:
+            return {}
+        return load_json(self.cache_path, {}, "language cache")
+
+    # Le crawler et le générateur de lettres partagent ce fichier : les langues enregistrées entre-temps
+    # par l'autre processus sont conservées (une détection est déterministe, les deux valeurs sont identiques)
+    def save(self):
+        if not self.cache_path:
+            return
+        cache = self._load()
+        cache.update(self.cache)
+        self.cache = cache
+        save_json(self.cache_path, cache, description="language cache")
+
+    # La clé dépend du détecteur : changer de détecteur ne réutilise pas les résultats de l'autre
+    def key(self, text):
+        return f"{self.backend}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    # Code ISO 639-1 de la langue du texte, ou la langue par défaut si le texte est vide ou indéterminable
+    def detect(self, text):
+        text = ' '.join((text or '').split())[:self.max_chars]
+        if not text:
+            return self.default
+        key = self.key(text)
+        language = self.cache.get(key)
+        if language is not None:
+            self.cache_hits += 1
+            return language
+        self.detections += 1
+        try:
+            language = self._detect(text)
+        except LangDetectException:
+            language = self.default
+        self.cache[key] = language
+        return language
+
+    def report(self):
+        print(f"Language detection ({self.backend}): {self.detections} texts analysed, {self.cache_hits} answered from the cache")
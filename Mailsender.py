@@ -27,6 +27,7 @@ import logging
 from concurrent.futures import ThreadPoolExecutor
 import requests
 import CoverBuilder
+from DataStore import DataStore, DATA_STORE_PATH
 
 # SSL Configuration
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -37,9 +38,7 @@ RETRY_DELAY = 3
 EMAIL_INFO_PATH = 'Json_Files\\email_info.json'
 CREDENTIALS_PATH = 'Json_Files\\credentials.json'
 TOKEN_PATH = 'token.json'
-RESULTS_PATH = 'Json_Files\\results.json'
 ATTACHMENTS_DIRS = ['attachments\\CV', 'attachments\\Others']
-DRAFTS_JSON_PATH = 'Json_Files\\drafts.json'
 MAX_CONCURRENT_DRAFTS = 20
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.send',
@@ -212,50 +211,41 @@ class GmailService:
             return False
 
 class DraftsManager:
-    def __init__(self):
+    def __init__(self, store: DataStore):
         self.drafts: Dict[str, str] = {}
-        
+        self.store = store
 
     def load(self):
-        if not os.path.exists(DRAFTS_JSON_PATH):
-            return
-
-        with open(DRAFTS_JSON_PATH, 'r', encoding='utf-8') as f:
-            self.drafts = json.load(f)
-
-    def save(self):
-        with open(DRAFTS_JSON_PATH, 'w', encoding='utf-8') as f:
-            json.dump(self.drafts, f, indent=4)
+        self.drafts = self.store.drafts()
 
     def add(self, draft_id: str, company: str):
         self.drafts[draft_id] = company
-        self.save()
+        self.store.add_draft(draft_id, company)
 
     def remove(self, draft_id: str):
         if draft_id in self.drafts:
             del self.drafts[draft_id]
-            self.save()
+            self.store.remove_draft(draft_id)
 
     async def verify_and_cleanup(self, gmail_service: GmailService):
-        valid_drafts = {}
-        for draft_id, company in self.drafts.items():
-            if await gmail_service.check_draft_existence(draft_id):
-                valid_drafts[draft_id] = company
-            else:
-                logger.info(f"Draft {draft_id} for {company} does not exist anymore. Removing from JSON and erasing PDF file.")
+        for draft_id, company in list(self.drafts.items()):
+            if not await gmail_service.check_draft_existence(draft_id):
+                logger.info(f"Draft {draft_id} for {company} does not exist anymore. Removing it from the store and erasing PDF file.")
                 await EmailSender.remove_pdf_file(company)
-
-        
-        self.drafts = valid_drafts
-        self.save()
+                self.remove(draft_id)
 
 class EmailSender:
     def __init__(self):
         self.gmail_service = GmailService()
-        self.drafts_manager = DraftsManager()
-        self.recipient_manager = RecipientManager()
+        self.store = DataStore()
+        self.drafts_manager = DraftsManager(self.store)
+        self.recipient_manager = RecipientManager(self.store)
         self.queue = asyncio.Queue()
         self.processed_companies = set()
+        # Dernière version de la base et dernier résultat lus : seuls les résultats ajoutés depuis sont relus
+        self.data_version = None
+        self.last_result_rowid = 0
+        self.results_lock = asyncio.Lock()
         self.draft_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DRAFTS)
         self.executor = ThreadPoolExecutor()
         self.logger = logging.getLogger(__name__)
@@ -281,6 +271,7 @@ class EmailSender:
         except Exception as e:
             self.logger.exception(f"Unexpected error in main loop: {e}")
         finally:
+            await CoverBuilder.shutdown()
             observer.join()
 
     async def initialize(self):
@@ -288,20 +279,27 @@ class EmailSender:
         self.drafts_manager.load()
         await self.drafts_manager.verify_and_cleanup(self.gmail_service)
 
+    # Appelée à chaque écriture dans la base, y compris celles de ce processus (brouillons) : rien n'est relu
+    # si aucune autre connexion n'a écrit, et seuls les résultats ajoutés depuis le dernier passage sont lus
     async def process_new_companies(self):
-        try:
-            async with aiofiles.open(RESULTS_PATH, 'r', encoding='utf-8') as file:
-                results = json.loads(await file.read())
-        except Exception as e:
-            logger.exception(f"Error loading results.json: {e}")
-            return
-
-        for result in results:
-            company_name = result['company_name']
-            if company_name not in self.processed_companies:
-                logger.info(f"Processing new company: {company_name}")
-                await self.queue.put(CompanyResult(company_name, result['mails']))
-                self.processed_companies.add(company_name)
+        async with self.results_lock:
+            try:
+                data_version = await asyncio.to_thread(self.store.data_version)
+                if data_version == self.data_version:
+                    return
+                self.data_version = data_version
+                results = await asyncio.to_thread(self.store.results_after, self.last_result_rowid)
+            except Exception as e:
+                logger.exception(f"Error loading results: {e}")
+                return
+
+            for rowid, result in results:
+                self.last_result_rowid = max(self.last_result_rowid, rowid)
+                company_name = result['company_name']
+                if company_name not in self.processed_companies:
+                    logger.info(f"Processing new company: {company_name}")
+                    await self.queue.put(CompanyResult(company_name, result['mails']))
+                    self.processed_companies.add(company_name)
 
     async def check_drafts(self):
         while True:
@@ -337,13 +335,9 @@ class EmailSender:
 
     async def get_company_info(self, company_name: str) -> Optional[CompanyResult]:
         try:
-            async with aiofiles.open(RESULTS_PATH, 'r', encoding='utf-8') as file:
-                results = json.loads(await file.read())
-            
-            for result in results:
-                if result['company_name'] == company_name:
-                    return CompanyResult(company_name, result.get('mails', []))
-            
+            result = await asyncio.to_thread(self.store.result_named, company_name)
+            if result:
+                return CompanyResult(company_name, result.get('mails', []))
             return None
         except Exception as e:
             logger.exception(f"Error loading company info for {company_name}: {e}")
@@ -387,7 +381,7 @@ class EmailSender:
             for attempt in range(RETRY_ATTEMPTS):
                 try:
                     async with self.rebuild_lock:
-                        await CoverBuilder.build_covers('Json_Files/results.json', specific_company_name=company_name)
+                        await CoverBuilder.build_covers(self.store, specific_company_name=company_name)
 
                     generated_files = glob(os.path.join('Cover_PDF', f"*{company_name}.pdf"))
                     for generated_file in generated_files:
@@ -471,37 +465,34 @@ class EmailSender:
                 logger.error(f"Draft creation failed for {company_result.company_name}")
                 await self.queue.put(company_result)
 
+# Nouveaux résultats : écriture dans la base (fichier principal ou journal WAL). results.json n'est qu'un export
+# de la base, il n'est pas surveillé.
 class ResultsFileModifiedHandler(FileSystemEventHandler):
+    WATCHED_FILES = (os.path.basename(DATA_STORE_PATH), f"{os.path.basename(DATA_STORE_PATH)}-wal")
+
     def __init__(self, callback, loop):
         self.callback = callback
         self.loop = loop
 
     def on_modified(self, event):
-        if event.src_path.endswith('results.json'):
+        if event.src_path.endswith(self.WATCHED_FILES):
             asyncio.run_coroutine_threadsafe(self.callback(), self.loop)
 
 class RecipientManager:
-    def __init__(self):
+    def __init__(self, store: DataStore):
         self.recipients = {}
-        self.file_path = 'Json_Files/recipients.json'
+        self.store = store
 
     async def load(self,company_name: str = None):
         try:
-            async with aiofiles.open(self.file_path, 'r', encoding='utf-8') as file:
-                self.recipients = json.loads(await file.read())
+            self.recipients = await asyncio.to_thread(self.store.recipients)
             if company_name:
                 return self.recipients.get(company_name)
-        except FileNotFoundError:
-            self.recipients = {}
-        except json.JSONDecodeError:
-            print(f"Error decoding {self.file_path}. Starting with an empty dictionary.")
+        except Exception as e:
+            print(f"Error loading recipients: {e}. Starting with an empty dictionary.")
             self.recipients = {}
         return None
 
-    async def save(self):
-        async with aiofiles.open(self.file_path, 'w', encoding='utf-8') as file:
-            await file.write(json.dumps(self.recipients, ensure_ascii=False, indent=4))
-
     def get(self, company_name: str) -> Optional[str]:
         return self.recipients.get(company_name)
 
@@ -0,0 +1,130 @@
+import time
+import asyncio
+import statistics
+from urllib.parse import urlparse
+from playwright.async_api import Error as PlaywrightError
+
+# Types de ressources inutiles pour lire le HTML rendu et ses liens
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+# Domaines de suivi et de publicité : leurs scripts retardent le rendu sans modifier le contenu utile
+TRACKER_DOMAINS = frozenset({
+    'google-analytics.com', 'googletagmanager.com', 'googleadservices.com', 'googlesyndication.com', 'doubleclick.net',
+    'adservice.google.com', 'facebook.net', 'connect.facebook.net', 'hotjar.com', 'clarity.ms', 'segment.io', 'segment.com',
+    'mixpanel.com', 'snap.licdn.com', 'ads.linkedin.com', 'static.ads-twitter.com', 'analytics.twitter.com', 'bat.bing.com',
+    'criteo.com', 'criteo.net', 'taboola.com', 'outbrain.com', 'scorecardresearch.com', 'quantserve.com', 'adnxs.com',
+    'nr-data.net', 'hs-analytics.net', 'hs-banner.com', 'tiktok.com', 'yandex.ru', 'mc.yandex.ru'
+})
+
+READINESS_STRATEGIES = ('mutations', 'networkidle', 'load')
+MUTATION_QUIET_WINDOW = 0.5  # Durée sans modification du DOM après laquelle la page est considérée comme rendue (secondes)
+MUTATION_MAX_WAIT = 10  # Attente maximale de la fenêtre de calme (secondes)
+
+# Résout quand le DOM n'a plus été modifié pendant quietMs, ou au plus tard après maxMs
+MUTATION_QUIET_SCRIPT = """
+([quietMs, maxMs]) => new Promise(resolve => {
+    let timer = null;
+    let limit = null;
+    let observer = null;
+    const done = () => {
+        if (observer) {
+            observer.disconnect();
+        }
+        clearTimeout(timer);
+        clearTimeout(limit);
+        resolve();
+    };
+    observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+    limit = setTimeout(done, maxMs);
+})
+"""
+
+def is_tracker(host, tracker_domains):
+    host = host.lower().rstrip('.')
+    while host:
+        if host in tracker_domains:
+            return True
+        _, _, host = host.partition('.')
+    return False
+
+# Politique de chargement des pages Playwright : requêtes bloquées (types de ressources, traqueurs)
+# et critère de fin de rendu. Les octets téléchargés et les temps de rendu sont comptabilisés pour le rapport.
+class PageLoadPolicy:
+    def __init__(self, blocked_resource_types=BLOCKED_RESOURCE_TYPES, tracker_domains=TRACKER_DOMAINS, readiness='mutations',
+                 quiet_window=MUTATION_QUIET_WINDOW, max_wait=MUTATION_MAX_WAIT):
+        if readiness not in READINESS_STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy: {readiness}")
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.tracker_domains = frozenset(tracker_domains)
+        self.readiness = readiness
+        self.quiet_window = quiet_window
+        self.max_wait = max_wait
+        self.blocked_requests = 0
+        self.bytes_downloaded = 0
+        self.render_times = []
+
+    @property
+    def blocks_requests(self):
+        return bool(self.blocked_resource_types or self.tracker_domains)
+
+    def should_block(self, request):
+        if request.resource_type in self.blocked_resource_types:
+            return True
+        parsed = urlparse(request.url)
+        return parsed.scheme in ('http', 'https') and is_tracker(parsed.hostname or '', self.tracker_domains)
+
+    async def _route(self, route):
+        try:
+            if self.should_block(route.request):
+                self.blocked_requests += 1
+                await route.abort()
+            else:
+                await route.continue_()
+        except PlaywrightError:
+            # La page a été fermée pendant la requête
+            pass
+
+    async def _count_bytes(self, request):
+        try:
+            sizes = await request.sizes()
+            self.bytes_downloaded += sizes['responseBodySize'] + sizes['responseHeadersSize']
+        except PlaywrightError:
+            pass
+
+    # À appeler une fois sur chaque nouvelle page, avant la première navigation
+    async def install(self, page):
+        if self.blocks_requests:
+            await page.route('**/*', self._route)
+        page.on('requestfinished', self._count_bytes)
+
+    async def wait_until_ready(self, page):
+        if self.readiness != 'mutations':
+            await page.wait_for_load_state(self.readiness)
+            return
+        try:
+            await page.evaluate(MUTATION_QUIET_SCRIPT, [int(self.quiet_window * 1000), int(self.max_wait * 1000)])
+        except PlaywrightError:
+            # Redirection côté client pendant l'attente : attendre le chargement du nouveau document
+            await page.wait_for_load_state('domcontentloaded')
+
+    # Naviguer vers l'URL et attendre la fin du rendu selon la stratégie choisie ; retourne la réponse de navigation
+    async def load(self, page, url, timeout=30000):
+        start = time.monotonic()
+        wait_until = 'domcontentloaded' if self.readiness == 'mutations' else 'load'
+        response = await page.goto(url, timeout=timeout, wait_until=wait_until)
+        await asyncio.wait_for(self.wait_until_ready(page), timeout / 1000)
+        self.render_times.append(time.monotonic() - start)
+        return response
+
+    def report(self):
+        if not self.render_times:
+            return
+        blocking = ', '.join(sorted(self.blocked_resource_types)) or 'no resource types'
+        print(f"Browser page loads ({self.readiness}, blocking {blocking}{' and trackers' if self.tracker_domains else ''}): "
+              f"{len(self.render_times)} pages, median render time {statistics.median(self.render_times):.2f} s, "
+              f"{self.bytes_downloaded / 1e6:.1f} MB downloaded, {self.blocked_requests} requests blocked")
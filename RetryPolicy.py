@@ -0,0 +1,151 @@
+import time
+import socket
+import random
+import asyncio
+import aiohttp
+from urllib.parse import urlparse
+from playwright.async_api import Error as PlaywrightError
+from UrlCanonicalizer import canonicalize_url, url_key
+
+RETRY_ATTEMPTS = 5
+BACKOFF_BASE = 1.0  # Délai de la première nouvelle tentative, doublé à chaque échec (secondes)
+BACKOFF_MAX = 30.0  # Délai maximum entre deux tentatives (secondes)
+BREAKER_THRESHOLD = 2  # Nombre d'URLs abandonnées d'affilée après toutes les tentatives avant d'ouvrir le disjoncteur
+BREAKER_COOLDOWN = 15 * 60  # Durée pendant laquelle un hôte coupé n'est plus contacté (secondes)
+
+# Classement d'un échec
+RETRYABLE = 'retryable'  # Erreur passagère : nouvelle tentative après un délai
+FATAL = 'fatal'  # La page ne sera pas obtenue, inutile de réessayer (404, URL invalide...)
+MISSING = 'missing'  # La page n'existe pas (404, 410) : ni nouvelle tentative ni repli sur le navigateur
+DEAD_HOST = 'dead_host'  # L'hôte est injoignable (DNS, TLS, connexion refusée) : tout le site est abandonné
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+MISSING_STATUSES = frozenset({404, 410})
+
+# Erreurs réseau de Chromium, reconnues dans le message des exceptions Playwright
+DEAD_HOST_NET_ERRORS = ('ERR_NAME_NOT_RESOLVED', 'ERR_NAME_RESOLUTION_FAILED', 'ERR_CONNECTION_REFUSED', 'ERR_ADDRESS_UNREACHABLE',
+                        'ERR_CERT_', 'ERR_SSL_', 'ERR_BAD_SSL_CLIENT_AUTH_CERT')
+FATAL_NET_ERRORS = ('ERR_INVALID_URL', 'ERR_TOO_MANY_REDIRECTS', 'ERR_UNSAFE_REDIRECT', 'ERR_UNKNOWN_URL_SCHEME', 'ERR_BLOCKED_BY_CLIENT')
+
+def classify_status(status):
+    if status in RETRYABLE_STATUSES:
+        return RETRYABLE
+    if status in MISSING_STATUSES:
+        return MISSING
+    return FATAL
+
+def classify_exception(error):
+    if isinstance(error, aiohttp.TooManyRedirects):
+        return FATAL
+    if isinstance(error, aiohttp.ClientResponseError):
+        return classify_status(error.status)
+    if isinstance(error, aiohttp.InvalidURL):
+        return FATAL
+    if isinstance(error, (aiohttp.ClientSSLError, aiohttp.ServerFingerprintMismatch)):
+        return DEAD_HOST
+    if isinstance(error, aiohttp.ClientConnectorError):
+        os_error = error.os_error
+        # Domaine inexistant ou connexion refusée ; une panne DNS temporaire (EAI_AGAIN) reste passagère
+        if isinstance(os_error, socket.gaierror) and os_error.errno != socket.EAI_AGAIN:
+            return DEAD_HOST
+        if isinstance(os_error, ConnectionRefusedError):
+            return DEAD_HOST
+        return RETRYABLE
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        if any(net_error in message for net_error in DEAD_HOST_NET_ERRORS):
+            return DEAD_HOST
+        if any(net_error in message for net_error in FATAL_NET_ERRORS):
+            return FATAL
+    return RETRYABLE
+
+def parse_retry_after(value):
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+# Politique de nouvelles tentatives : seules les erreurs passagères sont réessayées, avec un délai exponentiel
+# aléatoire (full jitter). Un disjoncteur par hôte abandonne un site mort dès le premier échec définitif,
+# ou après plusieurs URLs abandonnées d'affilée.
+class RetryPolicy:
+    def __init__(self, attempts=RETRY_ATTEMPTS, base_delay=BACKOFF_BASE, max_delay=BACKOFF_MAX,
+                 breaker_threshold=BREAKER_THRESHOLD, breaker_cooldown=BREAKER_COOLDOWN, rng=None):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.rng = rng or random.Random()
+        self.retries = 0
+        self.sleep_time = 0.0
+        self.breaker_trips = 0
+        self.short_circuited = 0
+        self.fatal_errors = 0
+        self._consecutive_failures = {}
+        self._open_until = {}
+        self._missing = set()
+
+    # Hôte et port non standard, tels qu'ils figurent dans l'URL canonique
+    @staticmethod
+    def host(url):
+        return urlparse(canonicalize_url(url)).netloc.lower() or url
+
+    # Le disjoncteur de l'hôte est fermé (ou son délai de coupure est écoulé)
+    def allow(self, url):
+        open_until = self._open_until.get(self.host(url))
+        if open_until is None:
+            return True
+        if time.monotonic() >= open_until:
+            # Semi-ouvert : une tentative est autorisée, un nouvel échec rouvre le disjoncteur
+            del self._open_until[self.host(url)]
+            return True
+        self.short_circuited += 1
+        return False
+
+    # Disjoncteur ouvert pour cet hôte, sans compter de requête évitée ni passer en semi-ouvert
+    def is_open(self, url):
+        open_until = self._open_until.get(self.host(url))
+        return open_until is not None and time.monotonic() < open_until
+
+    def is_missing(self, url):
+        return url_key(url) in self._missing
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def backoff(self, attempt, retry_after=None):
+        delay = self.delay(attempt, retry_after)
+        print(f"Retrying in {delay:.1f} seconds...")
+        self.retries += 1
+        self.sleep_time += delay
+        await asyncio.sleep(delay)
+
+    def record_success(self, url):
+        self._consecutive_failures.pop(self.host(url), None)
+
+    def _trip(self, host):
+        self._open_until[host] = time.monotonic() + self.breaker_cooldown
+        self._consecutive_failures.pop(host, None)
+        self.breaker_trips += 1
+        print(f"Circuit opened for {host}: no more requests for {self.breaker_cooldown / 60:.0f} minutes")
+
+    # Échec définitif d'une URL : outcome est le classement de la dernière erreur
+    def record_failure(self, url, outcome):
+        host = self.host(url)
+        if outcome == MISSING:
+            self._missing.add(url_key(url))
+        if outcome != RETRYABLE:
+            self.fatal_errors += 1
+        if outcome == DEAD_HOST:
+            self._trip(host)
+        elif outcome == RETRYABLE:
+            self._consecutive_failures[host] = self._consecutive_failures.get(host, 0) + 1
+            if self._consecutive_failures[host] >= self.breaker_threshold:
+                self._trip(host)
+
+    def report(self):
+        print(f"Retries: {self.retries} retries, {self.sleep_time:.1f} s spent sleeping, {self.fatal_errors} fatal errors "
+              f"not retried, {self.breaker_trips} circuit breaker trips, {self.short_circuited} requests skipped by open circuits")
@@ -0,0 +1,173 @@
+import re
+import math
+import hashlib
+
+# Compter les jetons avec tiktoken s'il est installé (approximation du tokenizer du modèle), sinon estimer.
+# L'encodage est téléchargé à la première utilisation : hors ligne, l'estimation est utilisée.
+try:
+    import tiktoken
+    TOKEN_ENCODING = tiktoken.get_encoding('cl100k_base')
+except Exception:
+    TOKEN_ENCODING = None
+
+SUMMARY_TOKEN_BUDGET = 2500  # Nombre maximum de jetons de texte envoyés au modèle pour résumer un site
+SUMMARY_CHUNK_TOKENS = 625  # Taille maximale d'un morceau : le budget en donne environ 4, résumés en parallèle puis fusionnés
+# en un seul appel (SUMMARY_MERGE_FANIN), soit deux allers-retours vers le modèle
+CHARS_PER_TOKEN = 4  # Estimation utilisée quand tiktoken n'est pas installé
+SHINGLE_SIZE = 3  # Nombre de mots par bardeau pour l'empreinte simhash
+SIMHASH_MIN_WORDS = 8  # En dessous, seuls les doublons exacts (après normalisation) sont reconnus
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # Deux empreintes à distance <= 3 partagent forcément une des 4 bandes de 16 bits
+NEAR_DUPLICATE_DISTANCE = 3  # Distance de Hamming maximale entre deux blocs quasi identiques
+
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+DIGITS = re.compile(r'\d+')
+
+def count_tokens(text):
+    if TOKEN_ENCODING is not None:
+        return len(TOKEN_ENCODING.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+# Mots d'un bloc, en minuscules et avec les nombres uniformisés (« © 2023 » et « © 2024 » sont le même bloc)
+def normalized_words(text):
+    return WORD_PATTERN.findall(DIGITS.sub('0', text.lower()))
+
+# Chaque octet d'empreinte est étalé sur 8 compteurs de COUNTER_BITS bits : additionner les empreintes étalées
+# compte en une seule addition entière, pour chacun des 64 bits, le nombre de bardeaux où il vaut 1
+COUNTER_BITS = 20
+SPREAD_BYTE = [[sum(1 << ((position * 8 + bit) * COUNTER_BITS) for bit in range(8) if value >> bit & 1) for value in range(256)]
+               for position in range(SIMHASH_BITS // 8)]
+
+def simhash(words, shingle_size=SHINGLE_SIZE):
+    shingles = {' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    counters = 0
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        for position, byte in enumerate(reversed(digest)):
+            counters += SPREAD_BYTE[position][byte]
+    mask = (1 << COUNTER_BITS) - 1
+    half = len(shingles) / 2
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if (counters >> (bit * COUNTER_BITS) & mask) > half)
+
+def simhash_bands(fingerprint):
+    band_bits = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << band_bits) - 1
+    return [(band, fingerprint >> (band * band_bits) & mask) for band in range(SIMHASH_BANDS)]
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+# Découper un bloc trop long pour un morceau en fenêtres de mots
+def split_block(text, max_tokens):
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return [text]
+    words = text.split()
+    window = max(1, len(words) * max_tokens // tokens)
+    return [' '.join(words[i:i + window]) for i in range(0, len(words), window)]
+
+# Préparation du texte d'un site avant résumé : les blocs répétés d'une page à l'autre (en-tête, menu,
+# pied de page) ne sont gardés qu'une fois, les blocs restants sont classés par quantité d'information
+# (mots rares du site) et les meilleurs sont répartis, dans l'ordre du site, en morceaux comptés en jetons.
+class TextPreparer:
+    def __init__(self, token_budget=SUMMARY_TOKEN_BUDGET, chunk_tokens=SUMMARY_CHUNK_TOKENS):
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.sites = 0
+        self.blocks_in = 0
+        self.duplicate_blocks = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    # pages : liste des blocs de texte de chaque page, dans l'ordre de visite
+    def unique_blocks(self, pages):
+        blocks = []
+        exact = {}
+        bands = {}
+        for page_index, page_blocks in enumerate(pages):
+            for text in page_blocks:
+                text = ' '.join(text.split())
+                if not text:
+                    continue
+                self.blocks_in += 1
+                words = normalized_words(text)
+                key = ' '.join(words) or text
+                duplicate = exact.get(key)
+                fingerprint = None
+                if duplicate is None and len(words) >= SIMHASH_MIN_WORDS:
+                    fingerprint = simhash(words)
+                    duplicate = self._near_duplicate(fingerprint, bands, blocks)
+                if duplicate is not None:
+                    self.duplicate_blocks += 1
+                    blocks[duplicate]['pages'].add(page_index)
+                    continue
+                exact[key] = len(blocks)
+                if fingerprint is not None:
+                    for band in simhash_bands(fingerprint):
+                        bands.setdefault(band, []).append(len(blocks))
+                blocks.append({"text": text, "words": words, "fingerprint": fingerprint, "pages": {page_index}})
+        return blocks
+
+    @staticmethod
+    def _near_duplicate(fingerprint, bands, blocks):
+        for band in simhash_bands(fingerprint):
+            for index in bands.get(band, ()):
+                if hamming_distance(fingerprint, blocks[index]['fingerprint']) <= NEAR_DUPLICATE_DISTANCE:
+                    return index
+        return None
+
+    # Information d'un bloc : somme des IDF de ses mots distincts, atténuée selon le nombre de pages où il se répète
+    # (un pied de page présent partout reste candidat : il contient souvent le nom et l'adresse de l'entreprise)
+    @staticmethod
+    def rank(blocks):
+        document_frequency = {}
+        for block in blocks:
+            for word in set(block['words']):
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        total = len(blocks)
+        for block in blocks:
+            informative = {word for word in block['words'] if len(word) > 2 and not word.isdigit()}
+            information = sum(math.log(1 + total / document_frequency[word]) for word in informative)
+            block['score'] = information / (1 + math.log(len(block['pages'])))
+        return sorted(range(total), key=lambda index: blocks[index]['score'], reverse=True)
+
+    def pack(self, texts):
+        chunks = []
+        current = []
+        current_tokens = 0
+        for text, tokens in texts:
+            if current and current_tokens + tokens > self.chunk_tokens:
+                chunks.append('\n'.join(current))
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            chunks.append('\n'.join(current))
+        return chunks
+
+    # Retourne les morceaux de texte à résumer, chacun d'au plus self.chunk_tokens jetons
+    def prepare(self, pages):
+        self.sites += 1
+        self.tokens_in += sum(count_tokens(text) for page_blocks in pages for text in page_blocks)
+        blocks = []
+        for block in self.unique_blocks(pages):
+            for part in split_block(block['text'], self.chunk_tokens):
+                blocks.append(dict(block, text=part, words=normalized_words(part)) if part != block['text'] else block)
+        for block in blocks:
+            block['tokens'] = count_tokens(block['text'])
+
+        selected = set()
+        remaining = self.token_budget
+        for index in self.rank(blocks):
+            if blocks[index]['tokens'] <= remaining:
+                selected.add(index)
+                remaining -= blocks[index]['tokens']
+        self.tokens_out += self.token_budget - remaining
+        return self.pack((blocks[index]['text'], blocks[index]['tokens']) for index in sorted(selected))
+
+    def report(self):
+        if not self.sites:
+            return
+        print(f"Summary text: {self.sites} sites, {self.duplicate_blocks} of {self.blocks_in} blocks removed as repeated, "
+              f"{self.tokens_out} of {self.tokens_in} tokens sent to the model ({'tiktoken' if TOKEN_ENCODING else 'estimated'} counts)")
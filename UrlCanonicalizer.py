@@ -0,0 +1,47 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Paramètres de suivi marketing sans effet sur le contenu de la page
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'hsctatracking', 'mkt_tok'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+# Normaliser une URL : schéma et hôte en minuscules, port par défaut, slash final,
+# fragment, paramètres de suivi et ordre des paramètres de requête
+def canonicalize_url(url):
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+    host = (parts.hostname or '').rstrip('.')
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        credentials = parts.username + (f":{parts.password}" if parts.password else '')
+        host = f"{credentials}@{host}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    query_params = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if not is_tracking_param(name)]
+    query = urlencode(sorted(query_params))
+
+    return urlunsplit((scheme, host, path, query, ''))
+
+# Clé d'identité d'une page : URL canonique sans le schéma, pour que http et https soient confondus
+def url_key(url):
+    canonical = canonicalize_url(url)
+    _, separator, rest = canonical.partition('://')
+    return rest if separator else canonical
@@ -0,0 +1,48 @@
+import io
+import pytest
+from CompanyReader import iter_json_array, iter_jsonl, iter_csv, iter_companies
+
+# Texte du fichier, éléments attendus ou None si le fichier doit être refusé
+JSON_ARRAY_CASES = [
+    ('[]', []),
+    (' [ ] \n', []),
+    ('[1, 2 ,3]', [1, 2, 3]),
+    ('[{"company_name": "A", "mails": ["a@a.com"]}, {"company_name": "B, ]"}]', [{"company_name": "A", "mails": ["a@a.com"]}, {"company_name": "B, ]"}]),
+    ('[12345678901234567890]', [12345678901234567890]),
+    ('[1,,2]', None),
+    ('[,1]', None),
+    ('[1,]', None),
+    ('[1 2]', None),
+    ('[1]garbage', None),
+    ('[1] ]', None),
+    ('[1, 2', None),
+    ('[', None),
+    ('{"company_name": "A"}', None),
+    ('', None),
+]
+
+# Chaque cas est lu avec des blocs de toutes les tailles, pour couvrir les éléments coupés entre deux blocs
+@pytest.mark.parametrize("text, expected", JSON_ARRAY_CASES)
+def test_iter_json_array(text, expected):
+    for chunk_size in range(1, len(text) + 2):
+        if expected is None:
+            with pytest.raises(ValueError):
+                list(iter_json_array(io.StringIO(text), chunk_size))
+        else:
+            assert list(iter_json_array(io.StringIO(text), chunk_size)) == expected
+
+def test_iter_jsonl_skips_blank_and_invalid_lines():
+    text = '{"company_name": "A"}\n\nnot json\n{"company_name": "B"}\n'
+    assert list(iter_jsonl(io.StringIO(text))) == [{"company_name": "A"}, {"company_name": "B"}]
+
+def test_iter_csv_splits_list_fields():
+    text = 'company_name,website,mails\nA, https://a.com ,a@a.com; b@a.com\n'
+    assert list(iter_csv(io.StringIO(text, newline=''))) == [
+        {"company_name": "A", "website": "https://a.com", "mails": ["a@a.com", "b@a.com"]}
+    ]
+
+def test_iter_companies_rejects_unknown_extension(tmp_path):
+    path = tmp_path / "companies.xml"
+    path.write_text("<companies/>")
+    with pytest.raises(ValueError):
+        list(iter_companies(str(path)))
@@ -0,0 +1,66 @@
+import asyncio
+from DeliverabilityChecker import DeliverabilityChecker, StubResolver
+
+# Résolveur factice qui compte les résolutions et laisse les appels concurrents se chevaucher
+class CountingResolver(StubResolver):
+    def __init__(self, records=None, default=True):
+        super().__init__(records, default)
+        self.calls = []
+
+    async def check(self, domain, domain_i18n):
+        self.calls.append(domain)
+        await asyncio.sleep(0.01)
+        return await super().check(domain, domain_i18n)
+
+def test_one_lookup_per_domain_for_concurrent_addresses():
+    resolver = CountingResolver()
+    checker = DeliverabilityChecker(resolver)
+    emails = ["a@example.com", "b@example.com", "c@example.com", "d@other.org"]
+    assert asyncio.run(checker.validate_all(emails)) == emails
+    assert sorted(resolver.calls) == ["example.com", "other.org"]
+    assert checker.lookups == 2
+
+def test_cached_domain_is_not_resolved_again():
+    resolver = CountingResolver()
+    checker = DeliverabilityChecker(resolver)
+
+    async def validate_twice():
+        await checker.validate("a@example.com")
+        await checker.validate("b@example.com")
+
+    asyncio.run(validate_twice())
+    assert resolver.calls == ["example.com"]
+    assert checker.cache_hits == 1
+
+def test_undeliverable_domain_is_rejected_and_cached():
+    resolver = CountingResolver({"dead.example": False})
+    checker = DeliverabilityChecker(resolver)
+    assert asyncio.run(checker.validate_all(["a@dead.example", "b@dead.example", "c@example.com"])) == ["c@example.com"]
+    assert resolver.calls.count("dead.example") == 1
+    assert checker.cache["dead.example"]["deliverable"] is False
+
+def test_negative_result_expires_with_its_own_ttl():
+    resolver = CountingResolver({"dead.example": False})
+    checker = DeliverabilityChecker(resolver, positive_ttl=3600, negative_ttl=0)
+
+    async def validate_twice(email):
+        await checker.validate(email)
+        await checker.validate(email)
+
+    asyncio.run(validate_twice("a@dead.example"))
+    asyncio.run(validate_twice("a@example.com"))
+    assert resolver.calls == ["dead.example", "dead.example", "example.com"]
+
+def test_positive_result_expires_with_its_ttl():
+    resolver = CountingResolver()
+    checker = DeliverabilityChecker(resolver, positive_ttl=0)
+    checker.cache["example.com"] = {"deliverable": True, "error": None, "checked_at": 0}
+    assert asyncio.run(checker.validate("a@example.com")) == "a@example.com"
+    assert resolver.calls == ["example.com"]
+
+def test_stub_resolver_results_are_not_saved(tmp_path):
+    path = tmp_path / "mx_cache.json"
+    checker = DeliverabilityChecker(StubResolver(), cache_path=str(path))
+    asyncio.run(checker.validate("a@example.com"))
+    checker.save()
+    assert not path.exists()
@@ -0,0 +1,23 @@
+import time
+import asyncio
+from CompanyCraw import DomainThrottle, default_domain_delay, DOMAIN_MIN_DELAY
+
+def test_sequential_crawl_has_no_delay():
+    assert default_domain_delay(1) == 0.0
+    assert default_domain_delay(4) == DOMAIN_MIN_DELAY
+
+async def timed_requests(throttle, urls):
+    start = time.monotonic()
+    for url in urls:
+        async with throttle.slot(url):
+            pass
+    return time.monotonic() - start
+
+def test_delay_applies_per_domain():
+    throttle = DomainThrottle(min_delay=0.05)
+    assert asyncio.run(timed_requests(throttle, ["https://a.example/1", "https://b.example/1"])) < 0.05
+    assert asyncio.run(timed_requests(throttle, ["https://a.example/2", "https://a.example/3"])) >= 0.05
+
+def test_zero_delay_does_not_wait():
+    throttle = DomainThrottle(min_delay=default_domain_delay(1))
+    assert asyncio.run(timed_requests(throttle, [f"https://a.example/{i}" for i in range(20)])) < 0.05
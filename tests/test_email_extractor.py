@@ -0,0 +1,50 @@
+import base64
+import pytest
+from EmailExtractor import scan_emails, mailto_targets, decode_cfemail
+
+# Textes et adresses attendues
+EMAIL_CASES = [
+    ("Contact: info@example.com", ["info@example.com"]),
+    ("Contact: info @ example.com", ["info@example.com"]),
+    ("Contact: info@ example.com", ["info@example.com"]),
+    ("Contact: info @example.com", ["info@example.com"]),
+    ("Contact: info@example. com", ["info@example.com"]),
+    ("Contact: info@example .com", ["info@example.com"]),
+    ("Contact: info [at] example . com", ["info@example.com"]),
+    ("Contact: info at example [dot] co [dot] uk", ["info@example.co.uk"]),
+    ("Contact: info [at] example [dot] com", ["info@example.com"]),
+    ("Contact: info (at) example (dot) com", ["info@example.com"]),
+    ("Contact: info at example dot com", ["info@example.com"]),
+    ("Contact: info&#64;example&#46;com", ["info@example.com"]),
+    ("Write to jobs@example.com. Next sentence", ["jobs@example.com"]),
+    ("Write to jobs@example.com and hr@example.org", ["jobs@example.com", "hr@example.org"]),
+    ("Write to jobs@example.com. we reply within a day", ["jobs@example.com"]),
+    ("We meet at the office at noon", []),
+    ("Our team at Google. we love it", []),
+    ("We are at home. see you", []),
+    ("Located at Zurich. he said", []),
+    ("prices at 10. and", []),
+    ("Our team at Google.com is great", []),
+    ("Follow us @acme. we post daily", []),
+    ("Meet us at Example dot Com", []),
+    ("Price: 5 @ 10.00", []),
+]
+
+@pytest.mark.parametrize("text, expected", EMAIL_CASES)
+def test_scan_emails(text, expected):
+    assert [email for email, _, _ in scan_emails(text)] == expected
+
+def test_scan_emails_returns_positions_in_the_text():
+    text = "Write to jobs@example.com today"
+    assert list(scan_emails(text)) == [("jobs@example.com", 9, 25)]
+
+def test_base64_token_is_decoded():
+    token = base64.b64encode(b"hr@example.com").decode()
+    assert [email for email, _, _ in scan_emails(f"Contact {token}")] == ["hr@example.com"]
+
+def test_mailto_targets():
+    assert mailto_targets("mailto:a@example.com,b@example.com?subject=Hi") == ["a@example.com", "b@example.com"]
+
+def test_decode_cfemail():
+    encoded = '42' + ''.join(f"{ord(char) ^ 0x42:02x}" for char in "hr@example.com")
+    assert decode_cfemail(encoded) == "hr@example.com"
@@ -0,0 +1,79 @@
+import asyncio
+import CompanyCraw
+from TextPreparer import TextPreparer, count_tokens, SUMMARY_TOKEN_BUDGET, SUMMARY_CHUNK_TOKENS
+
+# Modèle factice : chaque appel de résumé est enregistré avec le nombre d'appels en cours au même moment
+class FakeModel:
+    def __init__(self, info_chunks=()):
+        self.info_chunks = set(info_chunks)
+        self.summary_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.company_names = []
+        self.information_calls = []
+
+    async def generate_summary(self, content, language, current_summary=""):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.summary_calls.append((content, current_summary))
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if current_summary:
+            return f"{current_summary}+{content.replace(chr(10), '')}"
+        return f"[{content}]" + ("@info@" if content in self.info_chunks else "")
+
+    async def extract_company_name(self, summary):
+        self.company_names.append(summary)
+        return "Acme"
+
+    async def process_information(self, context, addresses, names, company_name):
+        self.information_calls.append((context, company_name))
+
+def install(monkeypatch, model):
+    monkeypatch.setattr(CompanyCraw, "generate_summary", model.generate_summary)
+    monkeypatch.setattr(CompanyCraw, "extract_company_name", model.extract_company_name)
+    monkeypatch.setattr(CompanyCraw, "process_information", model.process_information)
+
+def test_default_budget_spans_several_chunks():
+    assert SUMMARY_TOKEN_BUDGET >= 2 * SUMMARY_CHUNK_TOKENS
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = iter(a + b + c for a in letters for b in letters for c in letters)
+    pages = [[" ".join(next(words) for _ in range(60)) for block in range(10)] for page in range(10)]
+    chunks = TextPreparer().prepare(pages)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= SUMMARY_CHUNK_TOKENS for chunk in chunks)
+
+def test_chunks_are_summarized_concurrently_then_merged(monkeypatch):
+    model = FakeModel()
+    install(monkeypatch, model)
+    chunks = ["a", "b", "c", "d"]
+    summary = asyncio.run(CompanyCraw.map_reduce_summary(chunks, "en", [], []))
+    map_calls = [call for call in model.summary_calls if not call[1]]
+    merge_calls = [call for call in model.summary_calls if call[1]]
+    assert [content for content, _ in map_calls] == chunks
+    assert model.max_in_flight == len(chunks)
+    assert len(merge_calls) == 1
+    assert summary == "[a]+[b][c][d]"
+
+def test_merge_is_a_tree_of_fanin_groups(monkeypatch):
+    model = FakeModel()
+    install(monkeypatch, model)
+    chunks = [str(i) for i in range(CompanyCraw.SUMMARY_MERGE_FANIN + 1)]
+    summary = asyncio.run(CompanyCraw.map_reduce_summary(chunks, "en", [], []))
+    merge_calls = [call for call in model.summary_calls if call[1]]
+    assert len(merge_calls) == 2
+    assert summary == "[0]+[1][2][3]+[4]"
+
+def test_single_chunk_needs_no_merge(monkeypatch):
+    model = FakeModel()
+    install(monkeypatch, model)
+    assert asyncio.run(CompanyCraw.map_reduce_summary(["only"], "en", [], [])) == "[only]"
+    assert len(model.summary_calls) == 1
+
+def test_info_tag_sends_only_tagged_chunks_to_extraction(monkeypatch):
+    model = FakeModel(info_chunks={"b", "d"})
+    install(monkeypatch, model)
+    summary = asyncio.run(CompanyCraw.map_reduce_summary(["a", "b", "c", "d"], "en", [], []))
+    assert "@info@" not in summary
+    assert model.company_names == ["[b]"]
+    assert sorted(model.information_calls) == [("b", "Acme"), ("d", "Acme")]
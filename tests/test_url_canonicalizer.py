@@ -0,0 +1,48 @@
+import pytest
+from UrlCanonicalizer import canonicalize_url, url_key
+
+# Couples d'URLs qui doivent donner la même clé canonique
+EQUIVALENT_URL_PAIRS = [
+    ("https://example.com/contact", "https://example.com/contact/"),
+    ("https://example.com/contact", "https://example.com/contact#form"),
+    ("https://example.com/contact", "https://example.com/contact?utm_source=x"),
+    ("https://example.com/contact", "https://example.com/contact/?utm_source=x&utm_medium=y#top"),
+    ("https://example.com/contact", "http://example.com/contact"),
+    ("https://example.com/contact", "HTTPS://Example.COM/contact"),
+    ("https://example.com/contact", "https://example.com:443/contact"),
+    ("http://example.com/contact", "http://example.com:80/contact"),
+    ("https://example.com/contact", "https://example.com./contact"),
+    ("https://example.com/", "https://example.com"),
+    ("https://example.com/", "https://example.com/?"),
+    ("https://example.com/", "https://example.com/#"),
+    ("https://example.com/jobs?a=1&b=2", "https://example.com/jobs?b=2&a=1"),
+    ("https://example.com/jobs?a=1&b=2", "https://example.com/jobs/?b=2&gclid=abc&a=1"),
+    ("https://example.com/jobs?a=1", "https://example.com/jobs?a=1&fbclid=xyz&mc_eid=1"),
+    ("https://example.com/team", "https://example.com/team?_ga=2.1234&_gl=1*abc"),
+    ("https://example.com/karriere", "https://EXAMPLE.com/karriere/#offene-stellen"),
+]
+
+# Couples d'URLs qui doivent rester distinctes
+DISTINCT_URL_PAIRS = [
+    ("https://example.com/contact", "https://example.com/contacts"),
+    ("https://example.com/contact", "https://www.example.com/contact"),
+    ("https://example.com/jobs?page=1", "https://example.com/jobs?page=2"),
+    ("https://example.com/jobs?id=1", "https://example.com/jobs"),
+    ("https://example.com/Contact", "https://example.com/contact"),
+    ("https://example.com:8080/contact", "https://example.com/contact"),
+]
+
+@pytest.mark.parametrize("first, second", EQUIVALENT_URL_PAIRS)
+def test_equivalent_urls_share_a_key(first, second):
+    assert url_key(first) == url_key(second)
+
+@pytest.mark.parametrize("first, second", DISTINCT_URL_PAIRS)
+def test_distinct_urls_keep_distinct_keys(first, second):
+    assert url_key(first) != url_key(second)
+
+def test_canonical_url_keeps_scheme():
+    assert canonicalize_url("HTTP://Example.com/contact/?utm_source=x#top") == "http://example.com/contact"
+    assert url_key("http://example.com/contact") == "example.com/contact"
+
+def test_unsupported_urls_are_left_unchanged():
+    assert canonicalize_url("mailto:info@example.com") == "mailto:info@example.com"